@@ -0,0 +1,9 @@
+import os
+
+# Variables de entorno del fichero .env (ENV_FILE), cargadas antes de que ningún módulo de la
+# app lea su configuración con os.getenv. Si no existe el fichero, ni se importa python-dotenv.
+_env_file = os.getenv("ENV_FILE", ".env")
+if os.path.exists(_env_file):
+    from dotenv import load_dotenv
+
+    load_dotenv(_env_file)
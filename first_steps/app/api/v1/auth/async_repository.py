@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import UserORM
+from .repository import UserRepository
+
+
+# Versión asíncrona del repositorio de usuarios (mismo esquema que AsyncPostRepository:
+# ejecuta el repositorio síncrono dentro de AsyncSession.run_sync).
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args):
+        return await self.db.run_sync(lambda session: getattr(UserRepository(session), method)(*args))
+
+    async def get_by_email(self, email: str) -> Optional[UserORM]:
+        return await self._run("get_by_email", email)
+
+    async def create(self, email: str, username: str, password_hash: str, is_admin: bool = False) -> UserORM:
+        return await self._run("create", email, username, password_hash, is_admin)
+
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        return await self._run("replace_password_hash", user_id, old_hash, new_hash)
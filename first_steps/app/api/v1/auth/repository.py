@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models import UserORM
+
+
+# Acceso a la tabla de usuarios. Recibe contraseñas ya hasheadas: el hash es caro y
+# se calcula fuera (app/core/passwords.py), no dentro de una transacción abierta.
+class UserRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_email(self, email: str) -> Optional[UserORM]:
+        return self.db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
+
+    def create(self, email: str, username: str, password_hash: str, is_admin: bool = False) -> UserORM:
+        user = UserORM(email=email, username=username, password_hash=password_hash, is_admin=is_admin)
+        self.db.add(user)
+        self.db.flush()
+        return user
+
+    # Solo reemplaza el hash si sigue siendo el que se verificó: si otra petición ya lo
+    # ha recalculado (o se ha cambiado la contraseña) no se pisa. Devuelve si se actualizó.
+    def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        result = self.db.execute(
+            update(UserORM)
+            .where(UserORM.id == user_id, UserORM.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        return result.rowcount == 1
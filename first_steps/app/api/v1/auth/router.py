@@ -1,16 +1,17 @@
+import time
 from fastapi import APIRouter,Depends, HTTPException, status
-from .schemas import Token
+from .schemas import Token, RevokeTokenRequest
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import create_access_token,get_current_user
+from app.core.db import AsyncSessionLocal, AsyncWriteSessionLocal
+from app.core.passwords import (hash_password_async, needs_rehash, verify_dummy_password_async,
+                                verify_password_async)
+from app.core.revocation import revoke_token
+from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, get_current_user, raise_forbidden
 from datetime import timedelta
+from .async_repository import AsyncUserRepository
 from .schemas import UserPublic
 
-# Base de datos simulada de usuarios (en memoria).
-FAKE_USERS = {
-    "alessandro@gmail.com": {"email": "alessandro@gmail.com", "username": "alessandro", "password": "password123"},
-    "alumno@example.com": {"email": "alumno@example.com", "username": "alumno", "password": "password123"},
-
-}
+# Los usuarios están en la tabla 'users' (se crean con 'python -m app.manage create-user').
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -20,13 +21,30 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 # como 'form-data' (username, password) en lugar de JSON.
 @router.post("/login",response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    # Busca el usuario en la "BD" usando el username enviado en el formulario.
-    user=FAKE_USERS.get(form_data.username)
-    if not user or user["password"] != form_data.password:
+    # Busca el usuario en la BD usando el username (email) enviado en el formulario.
+    # Se lee del primario, no de la réplica: un usuario recién creado tiene que poder entrar.
+    # La sesión se cierra antes de verificar: el hash tarda y no debe retener una conexión.
+    async with AsyncSessionLocal() as db:
+        user = await AsyncUserRepository(db).get_by_email(form_data.username)
+
+    # La verificación (scrypt) se hace en el pool de hilos, fuera del event loop.
+    if user is None:
+        valid = await verify_dummy_password_async(form_data.password)
+    else:
+        valid = await verify_password_async(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
+
+    # Si han cambiado los parámetros de coste, se recalcula el hash ahora que tenemos la contraseña.
+    if needs_rehash(user.password_hash):
+        new_hash = await hash_password_async(form_data.password)
+        async with AsyncWriteSessionLocal() as db:
+            await AsyncUserRepository(db).replace_password_hash(user.id, user.password_hash, new_hash)
+            await db.commit()
+
     token = create_access_token(
-        data={"sub": user["email"], "username": user["username"]},
-        expires_delta=timedelta(minutes=30)
+        data={"sub": user.email, "username": user.username, "admin": user.is_admin},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
     return {"access_token": token, "token_type": "bearer"}
@@ -36,3 +54,22 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 @router.get("/me",response_model=UserPublic)
 async def read_me(current=Depends(get_current_user)):
     return {"email": current["email"], "username": current["username"]}
+
+
+# Cierra la sesión: revoca el token con el que se hace la petición (hasta su 'exp').
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(current=Depends(get_current_user)):
+    if current["jti"] is None:  # token emitido antes de existir el 'jti': caduca solo
+        return
+    async with AsyncWriteSessionLocal() as db:
+        await revoke_token(db, current["jti"], current["exp"])
+
+
+# Revocación por un administrador (p. ej. un token filtrado), identificado por su 'jti'.
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(data: RevokeTokenRequest, current=Depends(get_current_user)):
+    if not current["admin"]:
+        raise raise_forbidden()
+    expires_at = data.expires_at or int(time.time()) + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    async with AsyncWriteSessionLocal() as db:
+        await revoke_token(db, data.jti, expires_at)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel,ConfigDict
+from pydantic import BaseModel,ConfigDict,Field
 from typing import Optional
 
 
@@ -19,4 +19,11 @@ class TokenData(BaseModel):
 class UserPublic (BaseModel):
     email: str
     username: str
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Esquema para que un administrador revoque un token por su 'jti'.
+# expires_at (segundos desde epoch, el 'exp' del token) es opcional: si no se conoce se guarda
+# hasta la duración máxima de un token, que es lo más que puede seguir siendo válido.
+class RevokeTokenRequest(BaseModel):
+    jti: str = Field(..., min_length=1, max_length=64)
+    expires_at: Optional[int] = None
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from app.core.admission import admission_stats
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+
+
+# Estado del control de admisión por ruta: peticiones en curso, profundidad de la cola
+# y rechazos acumulados (cola llena o espera agotada) desde que arrancó el proceso.
+@router.get("/admission")
+async def read_admission_stats():
+    return admission_stats()
@@ -0,0 +1,73 @@
+from typing import AsyncIterator, Optional, List, Tuple, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import PostORM
+from .repository import PostRepository
+
+
+# Versión asíncrona del repositorio para los endpoints 'async def'.
+# No duplica las consultas: cada método ejecuta el PostRepository síncrono dentro de
+# AsyncSession.run_sync. SQLAlchemy lo corre en un greenlet sobre el driver async
+# (aiosqlite/asyncpg), así que la espera de la BD no bloquea el event loop ni usa hilos.
+class AsyncPostRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(
+            lambda session: getattr(PostRepository(session), method)(*args, **kwargs))
+
+    async def get(self, post_id: int, profile: str = "detail", fields: Optional[Set[str]] = None) -> Optional[PostORM]:
+        return await self._run("get", post_id, profile, fields)
+
+    async def search(
+            self,
+            query: Optional[str],
+            order_by: str,
+            direction: str,
+            page: int,
+            per_page: int,
+            count: str = "exact",
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[Optional[int], List[dict], bool, Optional[list]]:
+        return await self._run("search", query, order_by, direction, page, per_page, count, fields)
+
+    async def search_after(
+            self,
+            query: Optional[str],
+            order_by: str,
+            direction: str,
+            after: Optional[list],
+            per_page: int,
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[List[dict], bool, Optional[list]]:
+        return await self._run("search_after", query, order_by, direction, after, per_page, fields)
+
+    async def by_tags(
+            self, tags: List[str], match: str = "any", after: Optional[int] = None, per_page: int = 20,
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[List[PostORM], bool]:
+        return await self._run("by_tags", tags, match, after, per_page, fields)
+
+    async def create_post(self, title: str, content: str, author: Optional[dict], tags: List[dict]) -> PostORM:
+        return await self._run("create_post", title=title, content=content, author=author, tags=tags)
+
+    async def update_post(self, post: PostORM, updates: dict) -> PostORM:
+        return await self._run("update_post", post, updates)
+
+    async def bulk_create(self, items: List[dict]) -> List[dict]:
+        return await self._run("bulk_create", items)
+
+    # Recorre todos los posts por lotes de 'batch_size' con un cursor del lado del servidor
+    # (yield_per): nunca hay más de un lote en memoria. Por cada lote se piden sus tags
+    # con una sola consulta. Produce listas de (fila, [tags]).
+    # Es nativo async (db.stream), no pasa por run_sync: run_sync no puede ceder resultados parciales.
+    async def stream_export(self, batch_size: int) -> AsyncIterator[list]:
+        statement = PostRepository.export_statement().execution_options(yield_per=batch_size)
+        result = await self.db.stream(statement)
+        async for rows in result.partitions(batch_size):
+            post_ids = [row.id for row in rows]
+            tags_by_post = {post_id: [] for post_id in post_ids}
+            tag_rows = await self.db.execute(PostRepository.tags_for_posts_statement(post_ids))
+            for post_id, name in tag_rows:
+                tags_by_post[post_id].append(name)
+            yield [(row, tags_by_post[row.id]) for row in rows]
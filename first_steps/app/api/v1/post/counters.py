@@ -0,0 +1,73 @@
+from typing import Dict, Optional
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import CounterORM, PostORM, TagORM, post_tags
+
+# Operaciones sobre la tabla 'counters' (ver app/models/counter.py).
+
+TOTAL_POSTS = "posts"
+
+
+def tag_counter_name(tag_id: int) -> str:
+    return f"tag:{tag_id}"
+
+
+# Suma 'posts_delta' al total de posts y tag_deltas[id] a cada tag, en la transacción de 'db'.
+# Un solo UPSERT (INSERT ... ON CONFLICT DO UPDATE SET value = value + excluded.value):
+# el incremento lo hace la BD de forma atómica, sin leer antes el valor.
+def bump_counters(db: Session, posts_delta: int = 0, tag_deltas: Optional[Dict[int, int]] = None) -> None:
+    rows = []
+    if posts_delta:
+        rows.append({"name": TOTAL_POSTS, "tag_id": None, "value": posts_delta})
+    for tag_id, delta in (tag_deltas or {}).items():
+        if delta:
+            rows.append({"name": tag_counter_name(tag_id), "tag_id": tag_id, "value": delta})
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = dialect_insert(CounterORM).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[CounterORM.name],
+            set_={"value": CounterORM.value + statement.excluded.value},
+        )
+        db.execute(statement)
+        return
+
+    # Otros motores: UPDATE y, si el contador no existía, INSERT.
+    for row in rows:
+        result = db.execute(
+            update(CounterORM).where(CounterORM.name == row["name"]).values(value=CounterORM.value + row["value"])
+        )
+        if result.rowcount == 0:
+            db.execute(insert(CounterORM).values(**row))
+
+
+# Total de posts según el contador (None si aún no se ha inicializado).
+def read_total_posts(db: Session) -> Optional[int]:
+    return db.scalar(select(CounterORM.value).where(CounterORM.name == TOTAL_POSTS))
+
+
+# Recalcula todos los contadores desde cero (mantenimiento o primera vez).
+# Los tags sin posts también reciben su contador (a 0).
+def rebuild_counters(db: Session) -> int:
+    db.execute(delete(CounterORM))
+    total = db.scalar(select(func.count()).select_from(PostORM)) or 0
+    rows = [{"name": TOTAL_POSTS, "tag_id": None, "value": total}]
+
+    # Se cuenta a través de 'posts' para ignorar filas huérfanas de post_tags.
+    per_tag = (
+        select(TagORM.id, func.count(PostORM.id))
+        .outerjoin(post_tags, post_tags.c.tag_id == TagORM.id)
+        .outerjoin(PostORM, PostORM.id == post_tags.c.post_id)
+        .group_by(TagORM.id)
+    )
+    rows += [
+        {"name": tag_counter_name(tag_id), "tag_id": tag_id, "value": count}
+        for tag_id, count in db.execute(per_tag).all()
+    ]
+    db.execute(insert(CounterORM), rows)
+    return len(rows)
@@ -0,0 +1,46 @@
+import base64
+import json
+from typing import Any, List
+
+
+# Cursor opaco para la paginación por keyset (cursor pagination).
+# En lugar de "salta N filas" (OFFSET), el cliente nos devuelve la clave del último
+# elemento que vio y la BD continúa desde ahí usando el índice: cuesta lo mismo
+# en la página 1 que en la 10.000.
+# El token es JSON codificado en base64 url-safe: el cliente no debe interpretarlo.
+def encode_cursor(order_by: str, direction: str, key: List[Any]) -> str:
+    payload = {"o": order_by, "d": direction, "k": key}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _is_row_id(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+
+
+# Decodifica y valida el cursor. Lanza ValueError si es inválido o si no corresponde
+# al orden pedido (un cursor de "id asc" no sirve para "title desc").
+def decode_cursor(token: str, order_by: str, direction: str) -> List[Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key = payload["k"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+    if payload.get("o") != order_by or payload.get("d") != direction:
+        raise ValueError("El cursor no corresponde al orden solicitado")
+
+    # Clave esperada: [id] para order_by=id y [lower(title), id] para order_by=title.
+    # El id tiene que caber en un entero de 64 bits (si no, la BD falla al recibirlo).
+    expected = 1 if order_by == "id" else 2
+    if not isinstance(key, list) or len(key) != expected or not _is_row_id(key[-1]):
+        raise ValueError("Cursor inválido")
+    if order_by in ("title", "name") and not isinstance(key[0], str):
+        raise ValueError("Cursor inválido")
+    # Catálogo de tags por número de posts: [posts, id], los dos enteros de 64 bits.
+    if order_by == "count" and not _is_row_id(key[0]):
+        raise ValueError("Cursor inválido")
+
+    return key
+
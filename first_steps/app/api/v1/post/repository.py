@@ -1,9 +1,74 @@
 
+import os
 from math import ceil
-from typing import Optional, List, Tuple
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session, selectinload, joinedload
-from app.models import PostORM, AuthorORM, TagORM
+from typing import Optional, List, Tuple, Set
+from sqlalchemy import select, insert, update, delete, func, or_, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload, joinedload, load_only, make_transient_to_detached
+from app.models import PostORM, AuthorORM, TagORM, CounterORM, post_tags
+from app.models.tag import normalize_tag_name
+from app.core.fulltext import get_fulltext_backend
+from app.core.cache import LRUMap
+from .counters import bump_counters, read_total_posts
+
+# Caché en memoria del proceso: clave normalizada del tag -> (id, nombre guardado).
+# Solo guarda tags leídos de la BD (ya confirmados): un tag recién creado en una transacción
+# que luego hace rollback nunca entra en la caché. TAG_ID_CACHE_SIZE=0 la desactiva.
+tag_id_cache = LRUMap(int(os.getenv("TAG_ID_CACHE_SIZE", "2048")))
+
+
+# Campos de un post que se pueden pedir con ?fields= (en el orden de PostPublic).
+# El id se devuelve siempre. None = todos los campos.
+POST_FIELDS = ("title", "content", "tags", "author", "id")
+
+
+# Perfiles de carga: qué relaciones (y columnas) trae cada tipo de consulta.
+# Las relaciones del modelo no se cargan solas (lazy="raise_on_sql"); cada consulta
+# declara lo que necesita, con un número fijo de SELECTs sea cual sea el número de filas.
+#  - list: listados. Solo las columnas que se serializan de tags y autor.
+#  - detail: un post completo.
+#  - write: antes de modificar con PUT (post completo con sus tags). Los borrados y PATCH
+#    no cargan el post: son sentencias directas (delete_posts, patch_post).
+# Con 'fields' (list/detail) solo se leen esas columnas (load_only) y relaciones; el resto
+# queda diferido con raiseload: si algo intentara leerlo, falla en vez de lanzar otro SELECT.
+def loader_options(profile: str, fields: Optional[Set[str]] = None) -> tuple:
+    if fields is not None and profile in ("list", "detail"):
+        columns = [getattr(PostORM, name) for name in ("title", "content") if name in fields]
+        # La versión y el uid se leen siempre: forman el ETag del detalle.
+        options = [load_only(PostORM.id, PostORM.version, PostORM.uid, *columns, raiseload=True)]
+        if "tags" in fields:
+            options.append(selectinload(PostORM.tags).load_only(TagORM.name))
+        if "author" in fields:
+            options.append(joinedload(PostORM.author).load_only(AuthorORM.name, AuthorORM.email))
+        return tuple(options)
+    if profile == "list":
+        return (
+            selectinload(PostORM.tags).load_only(TagORM.name),
+            joinedload(PostORM.author).load_only(AuthorORM.name, AuthorORM.email),
+        )
+    if profile in ("detail", "write"):
+        return (
+            selectinload(PostORM.tags),
+            joinedload(PostORM.author),
+        )
+    raise ValueError(f"Perfil de carga desconocido: {profile}")
+
+
+# Dict con la forma de PostPublic (solo los campos pedidos) a partir de un PostORM
+# cargado con loader_options(..., fields).
+def post_item(post: PostORM, fields: Optional[Set[str]] = None) -> dict:
+    item = {}
+    for name in POST_FIELDS:
+        if fields is not None and name not in fields and name != "id":
+            continue
+        if name == "tags":
+            item["tags"] = [{"name": tag.name} for tag in post.tags]
+        elif name == "author":
+            author = post.author
+            item["author"] = {"name": author.name, "email": author.email} if author else None
+        else:
+            item[name] = getattr(post, name)
+    return item
 
 
 # Patrón Repositorio: Abstrae la lógica de base de datos del Router (API).
@@ -12,81 +77,289 @@ class PostRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get(self, post_id: int) -> Optional[PostORM]:
+    def get(self, post_id: int, profile: str = "detail", fields: Optional[Set[str]] = None) -> Optional[PostORM]:
         # Construye la consulta SELECT * FROM posts WHERE id = post_id
-        post_find = select(PostORM).where(PostORM.id == post_id)
+        # con las relaciones del perfil indicado (el autor en la misma consulta, los tags en otra).
+        post_find = select(PostORM).options(*loader_options(profile, fields)).where(PostORM.id == post_id)
         # Ejecuta y devuelve un solo objeto o None si no existe.
         return self.db.execute(post_find).scalar_one_or_none()
 
+    # Consulta base compartida por la paginación clásica y por la de cursor.
+    # Selecciona columnas sueltas (no objetos ORM) con el autor en el mismo JOIN: los listados
+    # solo leen y serializan, así no se construyen instancias ni se guardan en la identity map.
+    # Con 'fields' solo se seleccionan esas columnas (y el JOIN del autor solo si se pide).
+    # Devuelve (consulta, expresión de relevancia o None si no hay búsqueda/ranking).
+    def _filtered(self, query: Optional[str], fields: Optional[Set[str]] = None):
+        columns = [PostORM.id] + [getattr(PostORM, name) for name in ("title", "content")
+                                  if fields is None or name in fields]
+        results = select(*columns)
+        if fields is None or "author" in fields:
+            results = results.add_columns(
+                AuthorORM.name.label("author_name"), AuthorORM.email.label("author_email")
+            ).outerjoin(AuthorORM, PostORM.author_id == AuthorORM.id)
+        if not query:
+            return results, None
+        # Búsqueda de texto completo sobre título y contenido (FTS5 / tsvector / LIKE).
+        backend = get_fulltext_backend(self.db.get_bind().dialect.name)
+        return backend.apply(results, query)
+
+    # Cláusulas ORDER BY. Para "title" se añade el id como desempate: así el orden es
+    # total (dos títulos iguales en minúsculas no se intercambian entre páginas).
+    # "relevance" ordena siempre de más a menos relevante; sin búsqueda equivale a "id".
+    @staticmethod
+    def _order_clauses(order_by: str, direction: str, rank=None) -> list:
+        if order_by == "relevance" and rank is not None:
+            return [rank.asc(), PostORM.id.asc()]
+        if order_by == "title":
+            cols = [func.lower(PostORM.title), PostORM.id]
+        else:
+            cols = [PostORM.id]
+        return [col.asc() if direction == "asc" else col.desc() for col in cols]
+
+    # Valor de orden que se lee junto a cada post para construir el cursor.
+    @staticmethod
+    def _sort_key(order_by: str):
+        return (func.lower(PostORM.title) if order_by == "title" else PostORM.id).label("sort_key")
+
+    # Convierte las filas de un listado en dicts con la forma de PostPublic (solo los campos pedidos).
+    # Los tags de toda la página se leen en una sola consulta (en el orden en que se asociaron).
+    def _list_items(self, rows: list, fields: Optional[Set[str]] = None) -> List[dict]:
+        if not rows:
+            return []
+        tags_by_post = {row.id: [] for row in rows}
+        if fields is None or "tags" in fields:
+            page_tags = (
+                select(post_tags.c.post_id, TagORM.name)
+                .join(TagORM, TagORM.id == post_tags.c.tag_id)
+                .where(post_tags.c.post_id.in_(tags_by_post))
+                .order_by(post_tags.c.post_id, post_tags.c.tag_id)
+            )
+            for post_id, name in self.db.execute(page_tags).all():
+                tags_by_post[post_id].append({"name": name})
+
+        items = []
+        for row in rows:
+            item = {
+                "title": row.title if fields is None or "title" in fields else None,
+                "content": row.content if fields is None or "content" in fields else None,
+                "tags": tags_by_post[row.id],
+                "author": ({"name": row.author_name, "email": row.author_email}
+                           if (fields is None or "author" in fields) and row.author_email else None),
+                "id": row.id,
+            }
+            if fields is not None:
+                item = {name: value for name, value in item.items() if name in fields or name == "id"}
+            items.append(item)
+        return items
+
     # Función compleja para buscar, filtrar y paginar.
-    # Devuelve una tupla: (total de items encontrados, lista de items en la página actual)
+    # count: cómo obtener el total.
+    #   "exact": SELECT count(*) sobre la consulta filtrada.
+    #   "counter": lee el contador mantenido de posts (solo válido sin filtro de búsqueda).
+    #   "none": no cuenta; hay_siguiente se sabe pidiendo una fila de más.
+    # Devuelve una tupla: (total o None, items de la página actual como dicts con la forma
+    # de PostPublic, hay_siguiente, clave del último item para construir el siguiente cursor)
     def search(
             self,
             query: Optional[str],
             order_by: str,
             direction: str,
             page: int,
-            per_page: int
-    ) -> Tuple[int, List[PostORM]]:
-
-        # 1. Inicia la consulta base
-        results = select(PostORM)
+            per_page: int,
+            count: str = "exact",
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[Optional[int], List[dict], bool, Optional[list]]:
 
-        # 2. Aplica filtro de búsqueda si existe 'query'
-        if query:
-            # ilike: Case-insensitive LIKE (busca mayúsculas y minúsculas)
-            results = results.where(PostORM.title.ilike(f"%{query}%"))
+        # 1. Inicia la consulta base y 2. aplica filtro de búsqueda si existe 'query'
+        results, rank = self._filtered(query, fields)
 
         # 3. Cuenta el total de resultados (sin paginar) para saber cuántas páginas habrá.
-        # Se usa una subquery para contar sobre los filtros ya aplicados.
-        total = self.db.scalar(select(func.count()).select_from(
-            results.subquery())) or 0
+        total = None
+        if count == "counter" and not query:
+            total = read_total_posts(self.db)
+        if count != "none" and total is None:
+            # Se usa una subquery para contar sobre los filtros ya aplicados.
+            total = self.db.scalar(select(func.count()).select_from(
+                results.subquery())) or 0
 
         if total == 0:
-            return 0, []
+            return 0, [], False, None
 
         # 4. Calcula la página actual asegurando que no sea menor a 1 ni mayor al total de páginas.
-        current_page = min(page, max(1, ceil(total/per_page)))
-
-        # 5. Define la columna de ordenamiento dinámicamente.
-        order_col = PostORM.id if order_by == "id" else func.lower(
-            PostORM.title)
+        # Sin total no se puede acotar: una página fuera de rango devuelve una lista vacía.
+        current_page = page if total is None else min(page, max(1, ceil(total/per_page)))
 
-        # 6. Aplica el orden (ASC o DESC)
-        results = results.order_by(
-            order_col.asc() if direction == "asc" else order_col.desc())
-        # results = sorted(
-        #     results, key=lambda post: post[order_by], reverse=(direction == "desc"))
+        # 5. y 6. Define las columnas de ordenamiento dinámicamente y aplica el orden (ASC o DESC)
+        results = results.add_columns(self._sort_key(order_by)).order_by(
+            *self._order_clauses(order_by, direction, rank))
 
-        # 7. Aplica Paginación (LIMIT y OFFSET)
+        # 7. Aplica Paginación (LIMIT y OFFSET). Sin total se pide una fila de más para saber si hay otra página.
         start = (current_page - 1) * per_page
-        # execute(...).scalars().all(): Ejecuta la query y convierte las filas de BD a objetos ORM.
-        items = self.db.execute(results.limit(
-            per_page).offset(start)).scalars().all()
-
-        return total, items
-
-    def by_tags(self, tags: List[str]) -> List[PostORM]:
-        normalized_tag_names = [tag.strip().lower()
-                                for tag in tags if tag.strip()]
+        limit = per_page + 1 if total is None else per_page
+        rows = self.db.execute(results.limit(limit).offset(start)).all()
+
+        if total is None:
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+        else:
+            has_next = current_page < ceil(total/per_page)
+
+        return total, self._list_items(rows, fields), has_next, self._last_key(rows, order_by)
+
+    # Paginación por keyset (cursor): en vez de OFFSET filtra "después de la última clave vista",
+    # de modo que la BD usa el índice y no recorre las filas de páginas anteriores.
+    # No cuenta el total. Pide per_page + 1 filas para saber si hay página siguiente.
+    # Devuelve: (items, hay_siguiente, clave del último item)
+    def search_after(
+            self,
+            query: Optional[str],
+            order_by: str,
+            direction: str,
+            after: Optional[list],
+            per_page: int,
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[List[dict], bool, Optional[list]]:
+        results, _ = self._filtered(query, fields)
+        results = results.add_columns(self._sort_key(order_by))
+
+        if after is not None:
+            results = results.where(self._after_clause(order_by, direction, after))
+
+        results = results.order_by(*self._order_clauses(order_by, direction))
+        rows = self.db.execute(results.limit(per_page + 1)).all()
+
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        return self._list_items(rows, fields), has_next, self._last_key(rows, order_by)
+
+    # Condición "estrictamente después de la clave" según el orden.
+    # Para (lower(title), id) se expande la comparación de tuplas con OR/AND,
+    # que es portable entre SQLite y Postgres. La condición redundante sobre lower(title) sola
+    # permite a la BD empezar a leer el índice (lower(title), id) justo en la clave del cursor.
+    @staticmethod
+    def _after_clause(order_by: str, direction: str, after: list):
+        if order_by == "id":
+            return PostORM.id > after[0] if direction == "asc" else PostORM.id < after[0]
+
+        title_key, last_id = after
+        lowered = func.lower(PostORM.title)
+        if direction == "asc":
+            return and_(lowered >= title_key, or_(lowered > title_key, PostORM.id > last_id))
+        return and_(lowered <= title_key, or_(lowered < title_key, PostORM.id < last_id))
+
+    # La clave se toma del valor calculado por la propia BD (lower() de SQL),
+    # no de Python, para que el siguiente filtro compare exactamente lo mismo.
+    # El orden por relevancia no es estable entre consultas: no admite cursor.
+    @staticmethod
+    def _last_key(rows: list, order_by: str) -> Optional[list]:
+        if not rows or order_by == "relevance":
+            return None
+        last = rows[-1]
+        if order_by == "id":
+            return [last.id]
+        return [last.sort_key, last.id]
+
+    # Posts con alguno (match="any") o con todos (match="all") los tags, por id ascendente,
+    # paginados por keyset: 'after' es el último id visto. Devuelve (items, hay_siguiente).
+    def by_tags(
+            self,
+            tags: List[str],
+            match: str = "any",
+            after: Optional[int] = None,
+            per_page: int = 20,
+            fields: Optional[Set[str]] = None
+    ) -> Tuple[List[PostORM], bool]:
+        normalized_tag_names = list(dict.fromkeys(
+            normalize_tag_name(tag) for tag in tags if tag.strip()))
 
         if not normalized_tag_names:
-            return []
+            return [], False
+
+        if match == "all" and len(normalized_tag_names) > 1:
+            condition = self._all_tags_condition(normalized_tag_names)
+            if condition is None:
+                return [], False
+        else:
+            # Filtra posts que tengan AL MENOS UNA etiqueta que coincida con la lista
+            # (IN sobre post_tags, que usa el índice (tag_id, post_id)).
+            condition = PostORM.id.in_(
+                select(post_tags.c.post_id)
+                .join(TagORM, TagORM.id == post_tags.c.tag_id)
+                .where(TagORM.name_key.in_(normalized_tag_names))
+            )
 
-        # Consulta avanzada con Joins
         post_list = (
             select(PostORM)
-            .options(
-                # Optimización: Carga tags y autor en la misma transacción para evitar el problema N+1
-                selectinload(PostORM.tags),
-                joinedload(PostORM.author),
+            # Optimización: Carga tags y autor con un número fijo de consultas para evitar el problema N+1
+            .options(*loader_options("list", fields))
+            .where(condition)
+            .order_by(PostORM.id.asc())
+            .limit(per_page + 1)
+        )
+        if after is not None:
+            post_list = post_list.where(PostORM.id > after)
+
+        items = self.db.execute(post_list).scalars().all()
+        return items[:per_page], len(items) > per_page
+
+    # Intersección de listas de posts (una por tag), empezando por la del tag con menos posts:
+    # se recorre esa lista en el índice (tag_id, post_id) y para cada post se comprueba
+    # cada uno de los demás tags con una búsqueda puntual en el mismo índice.
+    # El tamaño de cada lista sale de los contadores por tag (sin COUNT).
+    # Devuelve None si alguno de los tags no existe (ningún post puede tenerlos todos).
+    def _all_tags_condition(self, name_keys: List[str]):
+        rows = self.db.execute(
+            select(TagORM.id, CounterORM.value)
+            .outerjoin(CounterORM, CounterORM.tag_id == TagORM.id)
+            .where(TagORM.name_key.in_(name_keys))
+        ).all()
+        if len(rows) < len(name_keys):
+            return None
+        if any(size == 0 for _, size in rows):
+            return None
+
+        # Sin contador (aún no inicializado) se trata como la lista más larga.
+        tag_ids = [tag_id for tag_id, size in sorted(
+            rows, key=lambda row: row[1] if row[1] is not None else float("inf"))]
+
+        smallest = post_tags.alias("smallest")
+        candidates = select(smallest.c.post_id).where(smallest.c.tag_id == tag_ids[0])
+        for tag_id in tag_ids[1:]:
+            other = post_tags.alias()
+            candidates = candidates.where(
+                select(other.c.post_id)
+                .where(other.c.tag_id == tag_id, other.c.post_id == smallest.c.post_id)
+                .exists()
             )
-            # Filtra posts que tengan AL MENOS UNA etiqueta que coincida con la lista
-            .where(PostORM.tags.any(func.lower(TagORM.name).in_(normalized_tag_names)))
+        return PostORM.id.in_(candidates)
+
+    # --- Exportación ---
+    # Columnas sueltas (no objetos ORM): no se construyen instancias ni se guardan en la
+    # identity map de la sesión, así la memoria no crece con el número de filas.
+    @staticmethod
+    def export_statement():
+        return (
+            select(PostORM.id, PostORM.title, PostORM.content, PostORM.created_at,
+                   AuthorORM.name.label("author_name"), AuthorORM.email.label("author_email"))
+            .outerjoin(AuthorORM, PostORM.author_id == AuthorORM.id)
             .order_by(PostORM.id.asc())
         )
 
-        return self.db.execute(post_list).scalars().all()
+    # Tags de un lote de posts en una sola consulta: {post_id: [nombres]}.
+    @staticmethod
+    def tags_for_posts_statement(post_ids: List[int]):
+        return (
+            select(post_tags.c.post_id, TagORM.name)
+            .join(TagORM, TagORM.id == post_tags.c.tag_id)
+            .where(post_tags.c.post_id.in_(post_ids))
+            .order_by(post_tags.c.post_id, TagORM.name)
+        )
+
+    def tags_for_posts(self, post_ids: List[int]) -> dict:
+        tags_by_post = {post_id: [] for post_id in post_ids}
+        for post_id, name in self.db.execute(self.tags_for_posts_statement(post_ids)).all():
+            tags_by_post[post_id].append(name)
+        return tags_by_post
 
     # Lógica "Get or Create" para Autores.
     # Si el autor ya existe por email, lo devuelve. Si no, crea una instancia nueva (sin guardar aún).
@@ -108,17 +381,35 @@ class PostRepository:
         return author_obj
 
     # Lógica "Get or Create" para Tags.
+    # Busca por la clave normalizada (igualdad exacta sobre índice único).
+    # Si el id está en tag_id_cache no se consulta la BD: merge(load=False) registra el
+    # tag en la sesión como persistente sin hacer SELECT.
     def ensure_tag(self, name: str) -> TagORM:
+        key = normalize_tag_name(name)
+        cached = tag_id_cache.get(key)
+        if cached is not None:
+            tag_id, stored_name = cached
+            tag_obj = TagORM(id=tag_id, name=stored_name, name_key=key)
+            # Lo marca como "ya guardado en BD" (detached con identidad) para poder hacer merge sin SELECT.
+            make_transient_to_detached(tag_obj)
+            return self.db.merge(tag_obj, load=False)
+
         tag_obj = self.db.execute(
-            select(TagORM).where(TagORM.name.ilike(name))
+            select(TagORM).where(TagORM.name_key == key)
         ).scalar_one_or_none()
 
+        # Un tag creado en esta misma transacción (otra operación del lote de group commit)
+        # no se cachea: aún puede deshacerse.
+        created = self.db.info.setdefault("created_tag_keys", set())
         if tag_obj:
+            if key not in created:
+                tag_id_cache.set(key, (tag_obj.id, tag_obj.name))
             return tag_obj
 
-        tag_obj = TagORM(name=name)
+        tag_obj = TagORM(name=name, name_key=key)
         self.db.add(tag_obj)
         self.db.flush()
+        created.add(key)
         return tag_obj
 
     def create_post(self, title: str, content: str, author: Optional[dict], tags: List[dict]) -> PostORM:
@@ -127,24 +418,219 @@ class PostRepository:
             author_obj = self.ensure_author(author['username'], author['email'])
 
         # Crea el objeto PostORM
-        post = PostORM(title=title, content=content, author=author_obj)
+        post = PostORM(title=title, content=content, author=author_obj, tags=[])
 
-        # Asocia los tags (creándolos si no existen)
+        # Asocia los tags (creándolos si no existen). "Python" y "python" son el mismo tag: se enlaza una vez.
         for tag in tags:
             tag_obj = self.ensure_tag(tag["name"])
-            post.tags.append(tag_obj)
+            if tag_obj not in post.tags:
+                post.tags.append(tag_obj)
 
         # Agrega el post a la sesión. El commit final se hace en el router.
+        # No hace falta refresh: tras el flush ya tiene id y los tags/autor están en memoria.
         self.db.add(post)
         self.db.flush()
-        self.db.refresh(post)
+        # Contadores en la misma transacción: si el commit falla, tampoco se aplican.
+        bump_counters(self.db, 1, {tag_obj.id: 1 for tag_obj in post.tags})
         return post
 
     def update_post(self, post: PostORM, updates: dict) -> PostORM:
         for key, value in updates.items():
             setattr(post, key, value)
+        if updates:
+            post.version += 1
 
         return post
 
-    def delete_post(self, post: PostORM) -> None:
-        self.db.delete(post)
\ No newline at end of file
+    # Modificación parcial sin cargar el post: un solo UPDATE ... RETURNING (más las filas de
+    # post_tags si se añaden o quitan tags, sin leer la colección). Con expected (versión, uid)
+    # el UPDATE solo se aplica si el post sigue siendo ese y en esa versión (If-Match).
+    # Devuelve ("ok", {id, title, content, version, uid}), ("not_found", None) o ("conflict", None).
+    def patch_post(self, post_id: int, values: dict, expected: Optional[Tuple[int, str]] = None,
+                   add_tags: Optional[List[str]] = None, remove_tags: Optional[List[str]] = None) -> Tuple[str, Optional[dict]]:
+        statement = (
+            update(PostORM)
+            .where(PostORM.id == post_id)
+            .values(**values, version=PostORM.version + 1)
+            .returning(PostORM.id, PostORM.title, PostORM.content, PostORM.version, PostORM.uid)
+            .execution_options(synchronize_session=False)
+        )
+        if expected is not None:
+            version, uid = expected
+            statement = statement.where(PostORM.version == version, PostORM.uid == uid)
+        row = self.db.execute(statement).one_or_none()
+        if row is None:
+            # Solo en el caso de error: ¿no existe o ha cambiado de versión?
+            exists = self.db.scalar(select(PostORM.id).where(PostORM.id == post_id))
+            return ("conflict" if exists else "not_found"), None
+
+        tag_deltas = {}
+        if remove_tags:
+            tag_ids = list(self.resolve_tags(remove_tags, create=False).values())
+            if tag_ids:
+                removed = self.db.scalars(
+                    delete(post_tags)
+                    .where(post_tags.c.post_id == post_id, post_tags.c.tag_id.in_(tag_ids))
+                    .returning(post_tags.c.tag_id)
+                ).all()
+                tag_deltas.update({tag_id: -1 for tag_id in removed})
+        if add_tags:
+            tag_ids = list(self.resolve_tags(add_tags).values())
+            for tag_id in self._link_tags(post_id, tag_ids):
+                tag_deltas[tag_id] = tag_deltas.get(tag_id, 0) + 1
+        bump_counters(self.db, 0, tag_deltas)
+
+        return "ok", row._asdict()
+
+    # Enlaza tags a un post ignorando los que ya tenía. Devuelve los ids realmente añadidos.
+    def _link_tags(self, post_id: int, tag_ids: List[int]) -> List[int]:
+        if not tag_ids:
+            return []
+        rows = [{"post_id": post_id, "tag_id": tag_id} for tag_id in tag_ids]
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            # ON CONFLICT DO NOTHING ... RETURNING solo devuelve las filas insertadas.
+            return list(self.db.scalars(
+                dialect_insert(post_tags).values(rows).on_conflict_do_nothing().returning(post_tags.c.tag_id)))
+
+        # Otros motores: se descartan antes los que ya estaban.
+        linked = set(self.db.scalars(
+            select(post_tags.c.tag_id).where(post_tags.c.post_id == post_id, post_tags.c.tag_id.in_(tag_ids))))
+        missing = [row for row in rows if row["tag_id"] not in linked]
+        if missing:
+            self.db.execute(insert(post_tags), missing)
+        return [row["tag_id"] for row in missing]
+
+    # Borra posts por id sin cargarlos. Devuelve los ids que existían (y se han borrado).
+    # Primero sus filas de post_tags con RETURNING tag_id: son los contadores de tag a descontar,
+    # y así no depende del ON DELETE CASCADE (SQLite no lo aplica sin PRAGMA foreign_keys;
+    # en PostgreSQL, borrando antes el post, el CASCADE se llevaría las filas sin devolverlas).
+    def delete_posts(self, post_ids: List[int]) -> List[int]:
+        if not post_ids:
+            return []
+        tag_deltas = {}
+        for tag_id in self.db.scalars(
+                delete(post_tags).where(post_tags.c.post_id.in_(post_ids)).returning(post_tags.c.tag_id)):
+            tag_deltas[tag_id] = tag_deltas.get(tag_id, 0) - 1
+        deleted = list(self.db.scalars(
+            delete(PostORM).where(PostORM.id.in_(post_ids)).returning(PostORM.id)
+            .execution_options(synchronize_session=False)))
+        bump_counters(self.db, -len(deleted), tag_deltas)
+        return deleted
+
+    # Siguiente bloque de ids de posts con un tag (índice (tag_id, post_id) de post_tags).
+    def post_ids_with_tag(self, tag_id: int, limit: int) -> List[int]:
+        return list(self.db.scalars(
+            select(post_tags.c.post_id).where(post_tags.c.tag_id == tag_id)
+            .order_by(post_tags.c.post_id).limit(limit)))
+
+    # --- Ingesta masiva ---
+    # En lugar de un SELECT + flush() por autor y por tag (create_post), se resuelven todos
+    # los nombres con un único IN, se insertan los que faltan en bloque y los posts y
+    # sus relaciones con INSERTs de varias filas. El commit lo hace el router por lotes.
+
+    # Devuelve {email: id}, creando en bloque los autores que no existen.
+    def resolve_authors(self, authors: List[dict]) -> dict:
+        wanted = {}
+        for author in authors:
+            wanted.setdefault(author["email"], author["name"])
+        if not wanted:
+            return {}
+
+        found = dict(self.db.execute(
+            select(AuthorORM.email, AuthorORM.id).where(AuthorORM.email.in_(wanted))
+        ).all())
+        missing = [{"name": name, "email": email} for email, name in wanted.items() if email not in found]
+        if missing:
+            rows = self.db.execute(
+                insert(AuthorORM).returning(AuthorORM.email, AuthorORM.id, sort_by_parameter_order=True),
+                missing
+            ).all()
+            found.update(dict(rows))
+        return found
+
+    # Devuelve {clave normalizada: id}, creando en bloque los tags que no existen
+    # (con create=False los que no existen simplemente no aparecen).
+    # Se respeta la forma en la que llegó el nombre la primera vez (como ensure_tag).
+    def resolve_tags(self, names: List[str], create: bool = True) -> dict:
+        wanted = {}
+        for name in names:
+            name = name.strip()
+            if name:
+                wanted.setdefault(normalize_tag_name(name), name)
+        if not wanted:
+            return {}
+
+        found = {}
+        for key in wanted:
+            cached = tag_id_cache.get(key)
+            if cached is not None:
+                found[key] = cached[0]
+
+        # Como en ensure_tag: los creados en esta transacción no se cachean hasta confirmarse.
+        created = self.db.info.setdefault("created_tag_keys", set())
+        lookup = [key for key in wanted if key not in found]
+        if lookup:
+            for key, tag_id, stored_name in self.db.execute(
+                    select(TagORM.name_key, TagORM.id, TagORM.name).where(TagORM.name_key.in_(lookup))).all():
+                found[key] = tag_id
+                if key not in created:
+                    tag_id_cache.set(key, (tag_id, stored_name))
+
+        missing = [{"name": name, "name_key": key} for key, name in wanted.items() if key not in found]
+        if missing and create:
+            rows = self.db.execute(
+                insert(TagORM).returning(TagORM.name_key, TagORM.id, sort_by_parameter_order=True),
+                missing
+            ).all()
+            found.update(dict(rows))
+            created.update(row["name_key"] for row in missing)
+        return found
+
+    # Inserta un lote de posts. Cada item: {"title", "content", "author": {"name", "email"} | None,
+    # "tags": [nombres]}. Devuelve un resultado por item, en el mismo orden:
+    # {"status": "created", "id": ...} o {"status": "conflict", "detail": ...}
+    def bulk_create(self, items: List[dict]) -> List[dict]:
+        results: List[Optional[dict]] = [None] * len(items)
+
+        # Títulos que ya existen en la BD (un solo IN) o repetidos dentro del propio lote.
+        existing = set(self.db.scalars(
+            select(PostORM.title).where(PostORM.title.in_([item["title"] for item in items]))))
+        accepted = []
+        for index, item in enumerate(items):
+            if item["title"] in existing:
+                results[index] = {"status": "conflict", "detail": "El título ya existe, prueba con otro"}
+            else:
+                existing.add(item["title"])
+                accepted.append(index)
+
+        if accepted:
+            author_ids = self.resolve_authors([items[i]["author"] for i in accepted if items[i]["author"]])
+            tag_ids = self.resolve_tags([name for i in accepted for name in items[i]["tags"]])
+
+            post_ids = self.db.scalars(
+                insert(PostORM).returning(PostORM.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "title": items[i]["title"],
+                        "content": items[i]["content"],
+                        "author_id": author_ids[items[i]["author"]["email"]] if items[i]["author"] else None,
+                    }
+                    for i in accepted
+                ]
+            ).all()
+
+            links = []
+            tag_deltas = {}
+            for index, post_id in zip(accepted, post_ids):
+                # Un mismo tag repetido en el item solo se enlaza una vez.
+                for tag_id in dict.fromkeys(tag_ids[normalize_tag_name(name)] for name in items[index]["tags"] if name.strip()):
+                    links.append({"post_id": post_id, "tag_id": tag_id})
+                    tag_deltas[tag_id] = tag_deltas.get(tag_id, 0) + 1
+                results[index] = {"status": "created", "id": post_id}
+            if links:
+                self.db.execute(insert(post_tags), links)
+            bump_counters(self.db, len(post_ids), tag_deltas)
+
+        return results
@@ -1,22 +1,113 @@
 
+import csv
+import io
+import json
+import os
+import re
 from math import ceil
-from fastapi import APIRouter, Query, Depends, Path, status, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Depends, Header, Path, Request, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List, Optional, Union, Literal
-from app.core.db import get_db
-from .schemas import PostPublic, PaginatedPost, PostCreate, PostUpdate, PostSummary
-from .repository import PostRepository
+from typing import List, Optional, Set, Tuple, Union, Literal
+from app.core.db import get_async_db, get_async_write_db, AsyncReadSessionLocal, replica_may_lag
+from .schemas import (PostPublic, PaginatedPost, PostsByTagsPage, PostCreate, PostUpdate, PostPatch, PostPatched,
+                      PostSummary, BulkReport, BulkItemResult, BulkDeleteReport)
+from .async_repository import AsyncPostRepository
+from .repository import POST_FIELDS, PostRepository, post_item
+from .pagination import encode_cursor, decode_cursor
 from app.core.security import oauth2_scheme,get_current_user
+from app.core.cache import response_cache
+from app.core.fastjson import dumps, FastJSONResponse
+from app.core.group_commit import run_write
 
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 # APIRouter: Agrupa rutas relacionadas.
 # prefix="/posts": Todas las rutas aquí empezarán con /posts (ej. /posts/by-tags).
 
+# Máximo de posts por página en /posts/by-tags (límite duro, aunque se pida más).
+BY_TAGS_MAX_PER_PAGE = int(os.getenv("BY_TAGS_MAX_PER_PAGE", "100"))
 
-@router.get("", response_model=PaginatedPost)
-def list_posts(
+# Tamaño de lote por defecto de la importación masiva: cada lote es una transacción.
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+# Posts por transacción en el borrado masivo (DELETE /posts?ids=... o ?tag=...).
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "500"))
+
+
+# Guarda el JSON en la caché de respuestas y lo devuelve con su ETag
+# (o 304 si el cliente ya tiene esa versión). Sin etag, el ETag es el hash del cuerpo.
+def cached_response(request: Request, cache_key: str, body: bytes, tags: List[str], generation: int,
+                    etag: Optional[str] = None):
+    # Leído de la réplica justo después de una escritura: se responde pero no se guarda.
+    if getattr(request.state, "read_replica", False) and replica_may_lag():
+        generation = -1
+    return response_cache.store(cache_key, body, tags, generation, etag).to_response(request)
+
+
+# ETag del detalle de un post: su versión y su uid. La versión cambia con cada modificación
+# (PUT/PATCH); el uid distingue a un post nuevo que reutiliza el id de uno borrado.
+# Es lo que el cliente devuelve en If-Match para editar solo si nadie lo ha cambiado antes.
+def post_etag(version: int, uid: str) -> str:
+    return f'"v{version}-{uid}"'
+
+
+_POST_ETAG = re.compile(r'"v(\d+)-(\w+)"')
+
+
+# (versión, uid) que exige la cabecera If-Match. None si no hay cabecera o es "*" (cualquier versión).
+# Un If-Match que no es un ETag de post no puede coincidir: 412.
+def expected_etag(if_match: Optional[str]) -> Optional[Tuple[int, str]]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+    for value in if_match.split(","):
+        match = _POST_ETAG.fullmatch(value.strip().removeprefix("W/"))
+        if match:
+            return int(match.group(1)), match.group(2)
+    raise HTTPException(status_code=412, detail="If-Match no corresponde a ninguna versión del post")
+
+
+# Cuerpo JSON de PaginatedPost construido directamente, sin validar con Pydantic:
+# los items ya vienen del repositorio con la forma de PostPublic (datos de nuestra propia BD).
+def paginated_body(items: List[dict], **fields) -> bytes:
+    page = {
+        "page": None, "per_page": None, "total": None, "total_pages": None,
+        "has_prev": False, "has_next": False, "order_by": None, "direction": None,
+        "search": None, "next_cursor": None,
+    }
+    page.update(fields)
+    page["items"] = items
+    return dumps(page)
+
+
+# Dependencia del parámetro ?fields=title,tags: campos del post a devolver (sparse fieldsets).
+# Solo se leen de la BD las columnas y relaciones pedidas. El id se incluye siempre.
+def requested_fields(
+    fields: Optional[str] = Query(
+        default=None,
+        description=f"Campos separados por comas: {', '.join(POST_FIELDS)}. Por defecto, todos"
+    )
+) -> Optional[Set[str]]:
+    if fields is None:
+        return None
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - set(POST_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    return wanted | {"id"}
+
+
+# Si la respuesta está en caché se sirve directamente, sin abrir conexión a la BD.
+def cache_lookup(request: Request):
+    cache_key = response_cache.key_for(request)
+    return cache_key, response_cache.get(cache_key), response_cache.generation
+
+
+@router.get("", response_model=PaginatedPost, response_class=FastJSONResponse)
+async def list_posts(
+    request: Request,
     # Query Parameters (?text=...&page=...)
     text: Optional[str] = Query(
         default=None,
@@ -25,7 +116,7 @@ def list_posts(
     ),
     query: Optional[str] = Query(
         default=None,
-        description="Texto para buscar por título",
+        description="Texto para buscar en título y contenido (búsqueda de texto completo)",
         alias="search",
         min_length=3,
         max_length=50,
@@ -39,32 +130,80 @@ def list_posts(
         1, ge=1,
         description="Número de página (>=1)"
     ),
-    order_by: Literal["id", "title"] = Query(
-        "id", description="Campo de orden"
+    order_by: Literal["id", "title", "relevance"] = Query(
+        "id", description="Campo de orden. 'relevance' ordena de más a menos relevante según 'search'"
     ),
     direction: Literal["asc", "desc"] = Query(
         "asc", description="Dirección de orden"
     ),
-    # Inyección de Dependencia: Obtiene la sesión de BD creada en get_db
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor opaco devuelto en 'next_cursor'. Si se envía, se ignora 'page' y no se calcula el total"
+    ),
+    include_total: bool = Query(
+        True, description="Calcular el total de resultados. Con false no se cuenta nada (total y total_pages a null)"
+    ),
+    fields: Optional[Set[str]] = Depends(requested_fields),
+    # Inyección de Dependencia: Obtiene la sesión asíncrona de BD creada en get_async_db
+    db: AsyncSession = Depends(get_async_db)
 ):
+    cache_key, cached, generation = cache_lookup(request)
+    if cached:
+        return cached.to_response(request)
+
     # Instancia el repositorio pasándole la sesión de BD
-    repository = PostRepository(db)
+    repository = AsyncPostRepository(db)
     query = query or text
 
+    # Modo cursor (keyset): continúa tras la última clave vista, sin OFFSET ni COUNT.
+    if cursor is not None:
+        if order_by == "relevance":
+            raise HTTPException(status_code=400, detail="El orden por relevancia no admite cursor")
+        try:
+            after = decode_cursor(cursor, order_by, direction)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+        items, has_next, last_key = await repository.search_after(
+            query, order_by, direction, after, per_page, fields)
+
+        body = paginated_body(
+            items,
+            per_page=per_page,
+            has_prev=True,
+            has_next=has_next,
+            order_by=order_by,
+            direction=direction,
+            search=query,
+            next_cursor=encode_cursor(order_by, direction, last_key) if has_next else None,
+        )
+        return cached_response(request, cache_key, body, ["posts"], generation)
+
+    # Sin filtro el total sale del contador mantenido (sin COUNT); con filtro hay que contar.
+    if not include_total:
+        count = "none"
+    elif query:
+        count = "exact"
+    else:
+        count = "counter"
+
     # Llama a la lógica de búsqueda del repositorio
-    total, items = repository.search(
-        query, order_by, direction, page, per_page)
+    total, items, has_next, last_key = await repository.search(
+        query, order_by, direction, page, per_page, count, fields)
 
     # Cálculos matemáticos para la paginación
-    total_pages = ceil(total/per_page) if total > 0 else 0
-    current_page = 1 if total_pages == 0 else min(page, total_pages)
+    if total is None:
+        total_pages = None
+        current_page = page
+    else:
+        total_pages = ceil(total/per_page) if total > 0 else 0
+        current_page = 1 if total_pages == 0 else min(page, total_pages)
 
-    # Determina si hay páginas previas o siguientes para la UI
+    # Determina si hay páginas previas para la UI (has_next lo calcula el repositorio)
     has_prev = current_page > 1
-    has_next = current_page < total_pages if total_pages > 0 else False
 
-    return PaginatedPost(
+    body = paginated_body(
+        items,
         page=current_page,
         per_page=per_page,
         total=total,
@@ -74,110 +213,404 @@ def list_posts(
         order_by=order_by,
         direction=direction,
         search=query,
-        items=items
+        # Permite pasar de la paginación clásica al modo cursor desde cualquier página
+        next_cursor=encode_cursor(order_by, direction, last_key) if has_next and last_key else None,
     )
+    return cached_response(request, cache_key, body, ["posts"], generation)
 
 
-@router.get("/by-tags", response_model=List[PostPublic])
-def filter_by_tags(
+@router.get("/by-tags", response_model=PostsByTagsPage, response_class=FastJSONResponse)
+async def filter_by_tags(
+    request: Request,
     tags: List[str] = Query(
         ...,
         min_length=1,
         description="Una o más etiquetas. Ejemplo: ?tags=python&tags=fastapi"
     ),
-    db: Session = Depends(get_db)
+    match: Literal["any", "all"] = Query(
+        "any", description="'any': posts con alguna de las etiquetas. 'all': posts con todas"
+    ),
+    per_page: int = Query(
+        20, ge=1,
+        description=f"Número de resultados (máximo {BY_TAGS_MAX_PER_PAGE})"
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor opaco devuelto en 'next_cursor' para pedir la página siguiente"
+    ),
+    fields: Optional[Set[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    repository = PostRepository(db)
-    return repository.by_tags(tags)
+    cache_key, cached, generation = cache_lookup(request)
+    if cached:
+        return cached.to_response(request)
+
+    per_page = min(per_page, BY_TAGS_MAX_PER_PAGE)
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, "id", "asc")[0]
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    repository = AsyncPostRepository(db)
+    posts, has_next = await repository.by_tags(tags, match, after, per_page, fields)
+
+    # Mismo cuerpo que PostsByTagsPage, sin volver a validar (ver paginated_body).
+    body = dumps({
+        "tags": tags,
+        "match": match,
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": encode_cursor("id", "asc", [posts[-1].id]) if has_next else None,
+        "items": [post_item(post, fields) for post in posts],
+    })
+    return cached_response(request, cache_key, body, ["posts"], generation)
 
 
-@router.get("/{post_id}", response_model=Union[PostPublic, PostSummary], response_description="Post encontrado")
-def get_post(post_id: int = Path(
+EXPORT_CSV_COLUMNS = ["id", "title", "content", "created_at", "author_name", "author_email", "tags"]
+
+
+def _export_record(row, tags: List[str]) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "content": row.content,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "author": {"name": row.author_name, "email": row.author_email} if row.author_email else None,
+        "tags": tags,
+    }
+
+
+# Genera el cuerpo de la exportación lote a lote. Abre su propia sesión: el generador se
+# ejecuta mientras se envía la respuesta, cuando las dependencias del endpoint ya terminaron.
+async def _export_chunks(export_format: str, batch_size: int):
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_CSV_COLUMNS)
+        yield buffer.getvalue()
+
+    # La exportación completa es la lectura más pesada: va a la réplica si la hay.
+    async with AsyncReadSessionLocal() as db:
+        async for batch in AsyncPostRepository(db).stream_export(batch_size):
+            buffer = io.StringIO()
+            if export_format == "csv":
+                writer = csv.writer(buffer)
+                for row, tags in batch:
+                    writer.writerow([
+                        row.id, row.title, row.content,
+                        row.created_at.isoformat() if row.created_at else "",
+                        row.author_name or "", row.author_email or "", "|".join(tags),
+                    ])
+            else:
+                for row, tags in batch:
+                    buffer.write(json.dumps(_export_record(row, tags), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+
+
+# Exportación completa de posts en streaming (memoria constante, sin paginar ni COUNT).
+# Se declara antes de "/{post_id}" para que "export" no se interprete como un id.
+@router.get("/export", response_description="Todos los posts en NDJSON o CSV")
+async def export_posts(
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="Formato de salida"
+    ),
+    batch_size: int = Query(
+        1000, ge=1, le=10000,
+        description="Filas leídas de la BD por lote"
+    ),
+):
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(export_format, batch_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="posts.{export_format}"'},
+    )
+
+
+@router.get("/{post_id}", response_model=Union[PostPublic, PostSummary], response_class=FastJSONResponse,
+            response_description="Post encontrado")
+async def get_post(request: Request, post_id: int = Path(
     # Path Parameter: Valida que sea parte de la URL (/posts/1)
     ...,
     ge=1,
     title="ID del post",
     description="Identificador entero del post. Debe ser mayor a 1",
     example=1
-), include_content: bool = Query(default=True, description="Incluir o no el contenido"), db: Session = Depends(get_db)):
+), include_content: bool = Query(default=True, description="Incluir o no el contenido"),
+        fields: Optional[Set[str]] = Depends(requested_fields), db: AsyncSession = Depends(get_async_db)):
+
+    cache_key, cached, generation = cache_lookup(request)
+    if cached:
+        return cached.to_response(request)
+
+    # include_content=false equivale a PostSummary (id y título). Así el contenido ni se lee de la BD.
+    if not include_content:
+        fields = (fields or {"id", "title"}) - {"content"}
 
-    repository = PostRepository(db)
-    post = repository.get(post_id)
+    repository = AsyncPostRepository(db)
+    post = await repository.get(post_id, fields=fields)
 
     if not post:
         raise HTTPException(status_code=404, detail="Post no encontrado")
 
-    # Lógica condicional: Devuelve un esquema diferente según el parámetro include_content
-    if include_content:
-        return PostPublic.model_validate(post, from_attributes=True)
-
-    return PostSummary.model_validate(post, from_attributes=True)
+    # Solo f"post:{id}": crear otros posts (o invalidar los listados) no cambia este.
+    return cached_response(request, cache_key, dumps(post_item(post, fields)), [f"post:{post_id}"],
+                           generation, etag=post_etag(post.version, post.uid))
 
 
 @router.post("", response_model=PostPublic, response_description="Post creado (OK)", status_code=status.HTTP_201_CREATED)
-def create_post(post: PostCreate, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    repository = PostRepository(db)
+async def create_post(post: PostCreate, db: AsyncSession = Depends(get_async_write_db), user = Depends(get_current_user)):
+    # Convierte los modelos Pydantic a diccionarios para pasarlos al repositorio
+    tags = [tag.model_dump() for tag in post.tags]
+
+    # Operación de escritura (ver app/core/group_commit.py): se ejecuta sola con su commit
+    # o dentro de un lote de group commit. Devuelve el post ya serializado: autor y tags
+    # están en memoria tras el flush, no hace falta releerlo.
+    def operation(session):
+        created = PostRepository(session).create_post(
+            title=post.title, content=post.content, author=user, tags=tags)
+        return post_item(created)
+
     try:
-        # Convierte los modelos Pydantic a diccionarios para pasarlos al repositorio
-        post = repository.create_post(
-            title=post.title,
-            content=post.content,
-            author=user,
-            tags=[tag.model_dump() for tag in post.tags],
-        )
-        # Commit: Guarda permanentemente los cambios en la BD.
-        # Si falla algo antes de aquí, nada se guarda.
-        db.commit()
-        db.refresh(post)
-        return post
+        # run_write hace el commit (o el rollback si algo falla): si falla, nada se guarda.
+        item = await run_write(db, operation)
     except IntegrityError:
-        # Rollback: Deshace cualquier cambio pendiente si hubo error (ej. título duplicado)
-        db.rollback()
+        # Error de integridad: título duplicado
         raise HTTPException(
             status_code=409, detail="El título ya existe, prueba con otro")
     except SQLAlchemyError:
-        db.rollback()
         raise HTTPException(status_code=500, detail="Error al crear el post")
+    # Los listados y búsquedas cacheados ya no incluyen todos los posts.
+    response_cache.invalidate("posts")
+    return item
 
 
-@router.put("/{post_id}", response_model=PostPublic, response_description="Post actualizado", response_model_exclude_none=True)
-def update_post(post_id: int, data: PostUpdate, db: Session = Depends(get_db),user = Depends(get_current_user)):
+# Lee el cuerpo de /posts/bulk: un array JSON o NDJSON (un objeto JSON por línea).
+# El NDJSON se procesa mientras llega, sin cargar el cuerpo entero en memoria.
+# Produce (índice, objeto) o (índice, mensaje de error) si la línea no es JSON válido.
+async def iter_bulk_items(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        buffer = b""
+        index = 0
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+        return
 
-    repository = PostRepository(db)
-    post = repository.get(post_id)
+    try:
+        data = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser un array JSON o NDJSON")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser un array JSON o NDJSON")
+    for index, item in enumerate(data):
+        yield index, item
 
-    if not post:
-        raise HTTPException(status_code=404, detail="Post no encontrado")
 
+def _parse_line(line: bytes):
     try:
-        updates = data.model_dump(exclude_unset=True)
-        post = repository.update_post(post, updates)
-        db.commit()
-        db.refresh(post)
-        return post
+        return json.loads(line)
+    except ValueError:
+        return "Línea NDJSON inválida"
+
+
+# Inserta un lote y hace commit. Si otro proceso insertó un título o tag a la vez
+# (IntegrityError), se reintenta una vez: la comprobación previa ya verá esos conflictos.
+async def _commit_bulk_chunk(repository: AsyncPostRepository, db: AsyncSession, chunk: list) -> List[dict]:
+    for _ in range(2):
+        try:
+            results = await repository.bulk_create([item for _, item in chunk])
+            await db.commit()
+            return results
+        except IntegrityError:
+            await db.rollback()
+        except SQLAlchemyError:
+            await db.rollback()
+            break
+    return [{"status": "error", "detail": "Error al guardar el lote"}] * len(chunk)
+
+
+@router.post("/bulk", response_model=BulkReport, response_description="Resultado por elemento")
+async def bulk_create_posts(
+    request: Request,
+    chunk_size: int = Query(
+        BULK_CHUNK_SIZE, ge=1, le=5000,
+        description="Posts por transacción"
+    ),
+    db: AsyncSession = Depends(get_async_write_db),
+    user = Depends(get_current_user)
+):
+    repository = AsyncPostRepository(db)
+    report = BulkReport()
+    chunk = []
+    # Autor: siempre el usuario autenticado, como en create_post ('author' del lote se ignora:
+    # si no, cualquiera podría publicar en nombre de otro).
+    author = {"name": user["username"], "email": user["email"]}
+
+    async def flush():
+        results = await _commit_bulk_chunk(repository, db, chunk)
+        for (index, item), result in zip(chunk, results):
+            report.items.append(BulkItemResult(index=index, title=item["title"], **result))
+            if result["status"] == "created":
+                report.created += 1
+            elif result["status"] == "conflict":
+                report.conflicts += 1
+            else:
+                report.errors += 1
+        if report.created:
+            response_cache.invalidate("posts")
+        chunk.clear()
+
+    async for index, raw in iter_bulk_items(request):
+        try:
+            if isinstance(raw, str):
+                raise ValueError(raw)
+            post = PostCreate.model_validate(raw)
+        except (ValidationError, ValueError) as exc:
+            detail = "; ".join(err["msg"] for err in exc.errors()) if isinstance(exc, ValidationError) else str(exc)
+            report.items.append(BulkItemResult(index=index, status="invalid", detail=detail))
+            report.invalid += 1
+            continue
+
+        chunk.append((index, {
+            "title": post.title,
+            "content": post.content,
+            "author": author,
+            "tags": [tag.name for tag in post.tags],
+        }))
+        if len(chunk) >= chunk_size:
+            await flush()
+
+    if chunk:
+        await flush()
+
+    report.items.sort(key=lambda item: item.index)
+    return report
+
+
+@router.put("/{post_id}", response_model=PostPublic, response_description="Post actualizado", response_model_exclude_none=True)
+async def update_post(post_id: int, data: PostUpdate, db: AsyncSession = Depends(get_async_write_db),user = Depends(get_current_user)):
+    updates = data.model_dump(exclude_unset=True)
+
+    # None si el post no existe. El post se serializa dentro de la transacción.
+    def operation(session):
+        repository = PostRepository(session)
+        post = repository.get(post_id, profile="write")
+        if post is None:
+            return None
+        return post_item(repository.update_post(post, updates))
+
+    try:
+        item = await run_write(db, operation)
     except SQLAlchemyError:
-        db.rollback()
         raise HTTPException(
             status_code=500, detail="Error al actualizar el post")
+    if item is None:
+        raise HTTPException(status_code=404, detail="Post no encontrado")
+    response_cache.invalidate("posts", f"post:{post_id}")
+    return item
 
 
-@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(post_id: int, db: Session = Depends(get_db), user = Depends(get_current_user)):
-    repository = PostRepository(db)
-    post = repository.get(post_id)
+# Modificación parcial con control de concurrencia optimista.
+# Sin cargar el post: un UPDATE ... RETURNING que incrementa la versión. Con If-Match (el ETag
+# de GET /posts/{id}) solo se aplica si el post sigue en esa versión; si otro lo cambió antes: 412.
+@router.patch("/{post_id}", response_model=PostPatched, response_description="Post modificado")
+async def patch_post(post_id: int, data: PostPatch, response: Response,
+                     if_match: Optional[str] = Header(default=None),
+                     db: AsyncSession = Depends(get_async_write_db), user = Depends(get_current_user)):
+    expected = expected_etag(if_match)
+    values = data.model_dump(include={"title", "content"}, exclude_none=True)
+    add_tags = [tag.name for tag in data.add_tags]
+    remove_tags = [tag.name for tag in data.remove_tags]
 
-    if not post:
+    def operation(session):
+        return PostRepository(session).patch_post(post_id, values, expected, add_tags, remove_tags)
+
+    try:
+        result, item = await run_write(db, operation)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="El título ya existe, prueba con otro")
+    except SQLAlchemyError:
+        raise HTTPException(status_code=500, detail="Error al modificar el post")
+    if result == "not_found":
         raise HTTPException(status_code=404, detail="Post no encontrado")
+    if result == "conflict":
+        raise HTTPException(status_code=412, detail="El post ha cambiado desde que lo leíste (If-Match)")
+    response_cache.invalidate("posts", f"post:{post_id}")
+    response.headers["ETag"] = post_etag(item["version"], item["uid"])
+    return item
+
 
+# Borrado masivo por ids (?ids=1&ids=2) o de todos los posts de un tag (?tag=python).
+# Sentencias por conjuntos (DELETE ... WHERE id IN ...), en bloques de chunk_size posts:
+# cada bloque es una transacción corta, sin bloquear las demás escrituras durante todo el borrado.
+@router.delete("", response_model=BulkDeleteReport, response_description="Número de posts borrados")
+async def delete_posts(
+    ids: Optional[List[int]] = Query(default=None, description="Ids de los posts. Ejemplo: ?ids=1&ids=2"),
+    tag: Optional[str] = Query(default=None, description="Borra todos los posts con esta etiqueta"),
+    chunk_size: int = Query(BULK_DELETE_CHUNK_SIZE, ge=1, le=5000, description="Posts por transacción"),
+    db: AsyncSession = Depends(get_async_write_db),
+    user = Depends(get_current_user)
+):
+    if (ids is None) == (tag is None):
+        raise HTTPException(status_code=400, detail="Indica 'ids' o 'tag' (uno de los dos)")
+
+    deleted = []
     try:
-        repository.delete_post(post)
-        db.commit()
+        if ids is not None:
+            unique_ids = list(dict.fromkeys(ids))
+            for start in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[start:start + chunk_size]
+                deleted += await run_write(db, lambda session: PostRepository(session).delete_posts(chunk))
+        else:
+            def delete_chunk(session):
+                repository = PostRepository(session)
+                tag_ids = list(repository.resolve_tags([tag], create=False).values())
+                if not tag_ids:
+                    return []
+                return repository.delete_posts(repository.post_ids_with_tag(tag_ids[0], chunk_size))
+
+            # Bloque a bloque hasta que no queden posts con el tag.
+            while True:
+                chunk = await run_write(db, delete_chunk)
+                deleted += chunk
+                if len(chunk) < chunk_size:
+                    break
+    except SQLAlchemyError:
+        raise HTTPException(status_code=500, detail="Error al borrar los posts")
+    finally:
+        # También si falla a mitad: los bloques anteriores ya están confirmados.
+        if deleted:
+            response_cache.invalidate("posts", *(f"post:{post_id}" for post_id in deleted))
+
+    return {"deleted": len(deleted)}
+
+
+@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_async_write_db), user = Depends(get_current_user)):
+    # Sin cargar el post ni sus tags: DELETE ... RETURNING. Lista vacía si el post no existe.
+    def operation(session):
+        return PostRepository(session).delete_posts([post_id])
+
+    try:
+        deleted = await run_write(db, operation)
     except SQLAlchemyError:
-        db.rollback()
         raise HTTPException(
             status_code=500, detail="Error al eliminar el post")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Post no encontrado")
+    response_cache.invalidate("posts", f"post:{post_id}")
         
 
 @router.get("/secure")
-def secure_endpoint(token: str = Depends(oauth2_scheme)):
+async def secure_endpoint(token: str = Depends(oauth2_scheme)):
     return {"message": "Acceso con token", "token_recibido": token}
\ No newline at end of file
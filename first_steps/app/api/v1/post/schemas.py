@@ -1,5 +1,5 @@
 
-from typing import Optional, List, Union, Literal
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field, field_validator, EmailStr, ConfigDict
 
 
@@ -62,6 +62,21 @@ class PostUpdate(BaseModel):
     content: Optional[str] = None
 
 
+# Esquema para PATCH: campos a cambiar y tags a añadir o quitar (sin reenviar la lista completa).
+class PostPatch(PostUpdate):
+    content: Optional[str] = Field(None, min_length=10)
+    add_tags: List[Tag] = Field(default_factory=list)
+    remove_tags: List[Tag] = Field(default_factory=list)
+
+
+# Respuesta de PATCH: lo que devuelve el propio UPDATE ... RETURNING (sin releer tags ni autor).
+class PostPatched(BaseModel):
+    id: int
+    title: str
+    content: str
+    version: int
+
+
 # Esquema para RESPUESTA completa (Output al cliente).
 class PostPublic(PostBase):
     id: int
@@ -76,14 +91,49 @@ class PostSummary(BaseModel):
 
 
 # Esquema para respuesta PAGINADA.
+# En modo cursor no se cuenta el total: page, total y total_pages vienen a None
+# y se navega con next_cursor.
 class PaginatedPost(BaseModel):
-    page: int
+    page: Optional[int] = None
     per_page: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
     has_prev: bool
     has_next: bool
-    order_by: Literal["id", "title"]
+    order_by: Literal["id", "title", "relevance"]
     direction: Literal["asc", "desc"]
     search: Optional[str] = None
-    items: List[PostPublic]
\ No newline at end of file
+    next_cursor: Optional[str] = None
+    items: List[PostPublic]
+
+
+# Página de GET /posts/by-tags (paginación por cursor, orden por id ascendente).
+class PostsByTagsPage(BaseModel):
+    tags: List[str]
+    match: Literal["any", "all"]
+    per_page: int
+    has_next: bool
+    next_cursor: Optional[str] = None
+    items: List[PostPublic]
+
+
+# Resultado de cada elemento de una importación masiva (POST /posts/bulk).
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "conflict", "invalid", "error"]
+    id: Optional[int] = None
+    title: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class BulkReport(BaseModel):
+    created: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    errors: int = 0
+    items: List[BulkItemResult] = Field(default_factory=list)
+
+
+# Resultado de DELETE /posts?ids=... o ?tag=...
+class BulkDeleteReport(BaseModel):
+    deleted: int
@@ -0,0 +1,14 @@
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from .repository import TagRepository
+
+
+# Versión asíncrona del repositorio de tags (mismo esquema que AsyncPostRepository).
+class AsyncTagRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def catalogue(self, order_by: str, prefix: Optional[str], after: Optional[list],
+                        per_page: int) -> Tuple[List[dict], bool, Optional[list]]:
+        return await self.db.run_sync(
+            lambda session: TagRepository(session).catalogue(order_by, prefix, after, per_page))
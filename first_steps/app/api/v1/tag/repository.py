@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+from app.models import CounterORM, TagORM
+from app.models.tag import normalize_tag_name
+
+
+# Catálogo de tags con su número de posts.
+# El número sale de la tabla 'counters' (fila "tag:<id>"), que mantienen las escrituras de posts:
+# no hay GROUP BY sobre post_tags ni se cargan posts. Se recalcula con 'python -m app.manage rebuild-counters'.
+class TagRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Página de tags (solo los que tienen algún post), por número de posts (count, de más a menos)
+    # o por nombre (name, alfabético). Paginación por keyset: 'after' es la clave del último visto,
+    # [posts, id] o [name_key, id]. Devuelve (items, hay_más, clave del último).
+    def catalogue(self, order_by: str, prefix: Optional[str], after: Optional[list],
+                  per_page: int) -> Tuple[List[dict], bool, Optional[list]]:
+        statement = (
+            select(TagORM.id, TagORM.name, TagORM.name_key, CounterORM.value)
+            .join(CounterORM, CounterORM.tag_id == TagORM.id)
+            .where(CounterORM.value > 0)
+        )
+        if prefix:
+            # name_key está normalizado (casefold): el prefijo se normaliza igual.
+            statement = statement.where(TagORM.name_key.startswith(normalize_tag_name(prefix), autoescape=True))
+
+        if order_by == "count":
+            statement = statement.order_by(CounterORM.value.desc(), TagORM.id.desc())
+            if after is not None:
+                count, tag_id = after
+                statement = statement.where(or_(
+                    CounterORM.value < count, and_(CounterORM.value == count, TagORM.id < tag_id)))
+        else:
+            statement = statement.order_by(TagORM.name_key)
+            if after is not None:
+                statement = statement.where(TagORM.name_key > after[0])
+
+        rows = self.db.execute(statement.limit(per_page + 1)).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        items = [{"name": row.name, "posts": row.value} for row in rows]
+
+        last_key = None
+        if rows:
+            last = rows[-1]
+            last_key = [last.value, last.id] if order_by == "count" else [last.name_key, last.id]
+        return items, has_next, last_key
@@ -0,0 +1,58 @@
+import os
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
+from app.core.fastjson import dumps, FastJSONResponse
+from app.api.v1.post.pagination import encode_cursor, decode_cursor
+from app.api.v1.post.router import cache_lookup, cached_response
+from .async_repository import AsyncTagRepository
+from .schemas import TagPage
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+# Máximo de tags por página (límite duro, aunque se pida más).
+TAGS_MAX_PER_PAGE = int(os.getenv("TAGS_MAX_PER_PAGE", "100"))
+
+# Dirección de cada orden (fija): count de más a menos posts, name alfabético.
+DIRECTIONS = {"count": "desc", "name": "asc"}
+
+
+# Catálogo de tags con su número de posts: los N más usados (?order_by=count&per_page=N),
+# filtrados por prefijo (?prefix=py) y paginados por cursor.
+# Una consulta sobre los contadores: no cuenta post_tags en cada petición.
+@router.get("", response_model=TagPage, response_class=FastJSONResponse)
+async def list_tags(
+    request: Request,
+    order_by: Literal["count", "name"] = Query("count", description="'count': más usados primero. 'name': alfabético"),
+    prefix: Optional[str] = Query(default=None, min_length=1, max_length=30,
+                                  description="Solo tags que empiezan así (sin distinguir mayúsculas)"),
+    per_page: int = Query(20, ge=1, description=f"Número de tags (máximo {TAGS_MAX_PER_PAGE})"),
+    cursor: Optional[str] = Query(default=None, description="Cursor opaco devuelto en 'next_cursor'"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cache_key, cached, generation = cache_lookup(request)
+    if cached:
+        return cached.to_response(request)
+
+    per_page = min(per_page, TAGS_MAX_PER_PAGE)
+    direction = DIRECTIONS[order_by]
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, order_by, direction)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    items, has_next, last_key = await AsyncTagRepository(db).catalogue(order_by, prefix, after, per_page)
+
+    body = dumps({
+        "order_by": order_by,
+        "prefix": prefix,
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": encode_cursor(order_by, direction, last_key) if has_next else None,
+        "items": items,
+    })
+    # Los contadores solo cambian con escrituras de posts, que ya invalidan la etiqueta "posts".
+    return cached_response(request, cache_key, body, ["posts"], generation)
@@ -0,0 +1,18 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+
+# Tag del catálogo con su número de posts.
+class TagCount(BaseModel):
+    name: str
+    posts: int
+
+
+# Página de GET /tags (paginación por cursor).
+class TagPage(BaseModel):
+    order_by: Literal["count", "name"]
+    prefix: Optional[str] = None
+    per_page: int
+    has_next: bool
+    next_cursor: Optional[str] = None
+    items: List[TagCount]
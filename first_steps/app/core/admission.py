@@ -0,0 +1,167 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from fastapi import APIRouter
+from starlette.routing import compile_path
+
+# Control de admisión (load shedding) por ruta.
+# Sin límite, cuando la BD va lenta las peticiones se acumulan sin fin: todas esperan a un
+# pool de conexiones agotado, la latencia se dispara y el cliente no recibe ninguna señal.
+# Cada ruta tiene un máximo de peticiones en curso y una cola de espera acotada:
+#  - Si hay hueco, la petición entra directamente.
+#  - Si no, espera en la cola como mucho ADMISSION_QUEUE_TIMEOUT_MS.
+#  - Si la cola está llena (o se agota la espera), se responde 503 con Retry-After sin tocar la BD.
+#
+# Variables de entorno (ADMISSION_CONTROL=false lo desactiva):
+#  - ADMISSION_MAX_CONCURRENCY / ADMISSION_MAX_QUEUE: límites por defecto de cada ruta.
+#  - ADMISSION_QUEUE_TIMEOUT_MS: espera máxima en la cola.
+#  - ADMISSION_RETRY_AFTER_SECONDS: valor de la cabecera Retry-After.
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "32"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "2000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Límites propios (en curso, cola) de las rutas más caras; el resto usa los de por defecto.
+ROUTE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "POST /posts/bulk": (2, 2),        # cada petición escribe miles de filas
+    "DELETE /posts": (2, 2),           # borrado masivo
+    "GET /posts/export": (2, 2),       # recorre la tabla entera
+    "POST /posts": (16, 32),           # en SQLite solo hay un escritor: más concurrencia solo alarga la cola
+    "PUT /posts/{post_id}": (16, 32),
+    "PATCH /posts/{post_id}": (16, 32),
+    "DELETE /posts/{post_id}": (16, 32),
+    "POST /api/v1/auth/login": (8, 16),  # cada login ocupa un hilo del pool de hash de contraseñas
+}
+
+# Rutas que nunca se limitan: la monitorización tiene que responder justo cuando hay saturación.
+EXEMPT_PREFIXES = ("/api/v1/monitoring",)
+
+
+# Semáforo con cola acotada y contadores para monitorización.
+@dataclass
+class RouteLimiter:
+    max_concurrency: int
+    max_queue: int
+    active: int = 0
+    waiting: int = 0
+    max_waiting: int = 0
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+
+    def __post_init__(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    # True si la petición puede seguir; False si hay que rechazarla.
+    async def acquire(self, timeout: float) -> bool:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+        else:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return False
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+_limiters: Dict[str, RouteLimiter] = {}
+
+
+def get_limiter(route_key: str) -> RouteLimiter:
+    limiter = _limiters.get(route_key)
+    if limiter is None:
+        concurrency, queue = ROUTE_LIMITS.get(route_key, (ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE))
+        limiter = _limiters[route_key] = RouteLimiter(concurrency, queue)
+    return limiter
+
+
+# Estado de todas las rutas que han recibido peticiones (para el endpoint de monitorización).
+def admission_stats() -> dict:
+    return {key: limiter.snapshot() for key, limiter in sorted(_limiters.items())}
+
+
+# Tabla (regex, método, clave) de las rutas de los routers, en el mismo orden en que se
+# resuelven: "/posts/by-tags" va antes que "/posts/{post_id}". routers: pares (router, prefijo).
+def route_table(routers: Iterable[Tuple[APIRouter, str]]) -> List[Tuple[Pattern, str, str]]:
+    table = []
+    for router, prefix in routers:
+        for route in router.routes:
+            path = prefix + route.path
+            regex, _, _ = compile_path(path)
+            table.extend((regex, method, f"{method} {path}") for method in sorted(route.methods))
+    return table
+
+
+async def _send_overloaded(send) -> None:
+    body = b'{"detail":"Servidor saturado, vuelve a intentarlo en unos segundos"}'
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(ADMISSION_RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# Middleware ASGI: la plaza se libera cuando termina la respuesta completa
+# (también en las respuestas en streaming, como la exportación).
+class AdmissionControlMiddleware:
+    def __init__(self, app, routes: List[Tuple[Pattern, str, str]], queue_timeout_ms: Optional[float] = None):
+        self.app = app
+        self.routes = routes
+        self.queue_timeout = (queue_timeout_ms if queue_timeout_ms is not None else ADMISSION_QUEUE_TIMEOUT_MS) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if not ADMISSION_CONTROL or scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = get_limiter(self._route_key(scope))
+        if not await limiter.acquire(self.queue_timeout):
+            await _send_overloaded(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    # Plantilla de la ruta que atenderá la petición ("GET /posts/{post_id}").
+    # Las rutas que no están en la tabla (documentación, 404...) comparten la clave "*".
+    def _route_key(self, scope) -> str:
+        method, path = scope["method"], scope["path"]
+        for regex, route_method, key in self.routes:
+            if route_method == method and regex.match(path):
+                return key
+        return "*"
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlencode
+from fastapi import Request, Response
+
+# Caché de respuestas de lectura (read-through) con ETag.
+# Los posts se leen muchísimo más de lo que se escriben: guardamos el JSON ya serializado
+# y lo servimos sin tocar la BD ni Pydantic hasta que una escritura lo invalide.
+# Cada entrada lleva "etiquetas" (p. ej. "posts" para listados, "post:5" para un post):
+# al hacer commit de una escritura se invalidan exactamente las etiquetas afectadas.
+# La invalidación solo llega a la caché del proceso que hace la escritura: con varios procesos
+# (workers), los demás siguen sirviendo su copia hasta que caduca (RESPONSE_CACHE_TTL_SECONDS).
+
+# Número máximo de respuestas en memoria. RESPONSE_CACHE_SIZE=0 la desactiva (el ETag se mantiene).
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+# Segundos que vale cada respuesta guardada; es el retraso máximo entre procesos. 0 = sin caducidad.
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+
+    # Devuelve 304 Not Modified si el cliente ya tiene esta versión (If-None-Match).
+    def to_response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag}
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+# ETag fuerte: hash del cuerpo exacto de la respuesta.
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+# If-None-Match puede traer varios ETags separados por comas, "*" o ETags débiles (W/"...").
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+# Diccionario acotado con expulsión LRU para cachés pequeñas de valores (p. ej. nombre de tag -> id).
+class LRUMap:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Interfaz de los backends de caché. Para usar otro almacén (Redis, memcached...)
+# basta con implementar estos métodos y pasarlo a ResponseCache.
+# Clase abstracta: un backend al que le falte alguno falla al crearlo, no en la primera petición.
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    def invalidate(self, tags: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+# Backend en memoria del proceso con expulsión LRU (la menos usada recientemente)
+# y caducidad: una entrada con más de ttl segundos ya no se sirve.
+class LRUCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # clave -> (respuesta, etiquetas, instante de caducidad o None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Índice inverso etiqueta -> claves, para invalidar sin recorrer toda la caché.
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str]) -> None:
+        if self.maxsize <= 0:
+            return
+        tags = tuple(tags)
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, tags, expires_at)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        # Se incrementa en cada invalidación. Una lectura que empezó antes de una escritura
+        # no guarda su resultado (podría ser ya antiguo).
+        self.generation = 0
+
+    # Clave: ruta + parámetros de la query ordenados (?a=1&b=2 y ?b=2&a=1 son la misma).
+    # Los valores se vuelven a codificar: un valor con '&' o '=' ("?tags=a%26tags%3Db")
+    # no puede dar la misma clave que dos parámetros ("?tags=a&tags=b").
+    @staticmethod
+    def key_for(request: Request) -> str:
+        return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.backend.get(key)
+
+    # etag: si no se indica, el hash del cuerpo.
+    def store(self, key: str, body: bytes, tags: Iterable[str], generation: int,
+              etag: Optional[str] = None) -> CachedResponse:
+        cached = CachedResponse(body=body, etag=etag or make_etag(body))
+        if generation == self.generation:
+            self.backend.set(key, cached, tags)
+        return cached
+
+    def invalidate(self, *tags: str) -> None:
+        self.generation += 1
+        self.backend.invalidate(tags)
+
+
+response_cache = ResponseCache(LRUCacheBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS))
@@ -1,11 +1,21 @@
 import os
+import time
+from math import ceil
+from fastapi import Request, Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker,Session,DeclarativeBase
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.sql_timing import instrument_engine
+from app.core.sqlite_profile import apply_sqlite_profile
 
 # Obtiene la URL de la base de datos de las variables de entorno.
 # Si no existe, usa SQLite por defecto (crea un archivo blog.db local).
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./blog.db")
 
+# DB_ECHO=true imprime cada consulta SQL en la consola (solo para depurar en local).
+# En producción se usa la instrumentación de app/core/sql_timing.py.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
 engine_kwargs = {}
 
 # Configuración específica para SQLite:
@@ -15,9 +25,11 @@ if DATABASE_URL.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
 
 # create_engine: Establece la conexión física con la base de datos.
-# echo=True: Imprime las consultas SQL en la consola (útil para depurar).
+# echo: Imprime las consultas SQL en la consola (solo si DB_ECHO=true).
 # pool_pre_ping=True: Verifica que la conexión esté viva antes de usarla.
-engine = create_engine(DATABASE_URL, echo=True, future=True, pool_pre_ping=True, **engine_kwargs)
+engine = create_engine(DATABASE_URL, echo=DB_ECHO, future=True, pool_pre_ping=True, **engine_kwargs)
+instrument_engine(engine)
+apply_sqlite_profile(engine)
 
 # sessionmaker: Es una "fábrica" de sesiones.
 # Una sesión es el "manejador" que usaremos para hablar con la BD en cada petición.
@@ -25,6 +37,76 @@ engine = create_engine(DATABASE_URL, echo=True, future=True, pool_pre_ping=True,
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
 
 
+# Traduce la URL síncrona a su equivalente con driver asíncrono:
+# sqlite -> aiosqlite, postgresql -> asyncpg. Si la URL ya indica un driver async se respeta.
+def to_async_url(url: str) -> str:
+    if url.startswith("sqlite+aiosqlite") or url.startswith("postgresql+asyncpg") or url.startswith("postgresql+psycopg"):
+        return url
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    if url.startswith("postgres"):
+        return "postgresql+asyncpg" + url[url.index(":"):]
+    return url
+
+
+# Motor asíncrono: las consultas no ocupan un hilo del threadpool mientras esperan a la BD,
+# el event loop atiende otras peticiones mientras tanto.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+IS_SQLITE = ASYNC_DATABASE_URL.startswith("sqlite")
+
+# SQLite admite un solo escritor a la vez (en WAL, con lectores en paralelo). Con dos pools:
+#  - lectura: SQLITE_READ_POOL_SIZE conexiones para los GET.
+#  - escritura: UNA sola conexión. Las escrituras de este proceso esperan su turno en el pool
+#    (sin ocupar el event loop) en lugar de pelearse por el bloqueo del fichero y fallar con
+#    "database is locked". SQLITE_WRITE_POOL_TIMEOUT: segundos máximos de espera.
+# En otros motores (Postgres) lectura y escritura comparten el mismo engine.
+def _read_pool_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"pool_size": int(os.getenv("SQLITE_READ_POOL_SIZE", "16")), "max_overflow": 0}
+    return {}
+
+
+if IS_SQLITE:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, echo=DB_ECHO, pool_pre_ping=True, **_read_pool_kwargs(ASYNC_DATABASE_URL))
+    async_write_engine = create_async_engine(
+        ASYNC_DATABASE_URL, echo=DB_ECHO, pool_pre_ping=True, pool_size=1, max_overflow=0,
+        pool_timeout=float(os.getenv("SQLITE_WRITE_POOL_TIMEOUT", "30")))
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=DB_ECHO, pool_pre_ping=True)
+    async_write_engine = async_engine
+
+# Réplica de solo lectura (opcional): DATABASE_READ_URL. Los GET del router de posts leen de
+# ella y las escrituras van al primario. Sin réplica, async_read_engine es el primario.
+# En local se puede probar con otro fichero SQLite (una copia de blog.db) como réplica.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+if DATABASE_READ_URL:
+    _read_url = to_async_url(DATABASE_READ_URL)
+    async_read_engine = create_async_engine(_read_url, echo=DB_ECHO, pool_pre_ping=True, **_read_pool_kwargs(_read_url))
+else:
+    async_read_engine = async_engine
+
+# Los eventos se registran en el engine síncrono interno del async.
+for _async_engine in {async_engine, async_write_engine, async_read_engine}:
+    instrument_engine(_async_engine.sync_engine)
+    apply_sqlite_profile(_async_engine.sync_engine)
+
+# expire_on_commit=False: tras el commit los objetos conservan sus valores. En async no se
+# puede recargar un atributo "perezosamente" al serializar la respuesta.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncWriteSessionLocal = async_sessionmaker(
+    bind=async_write_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Read-your-writes: la réplica va con algo de retraso. Durante READ_YOUR_WRITES_SECONDS tras
+# una escritura, el cliente que escribió (cookie PRIMARY_COOKIE) lee del primario, y lo que se
+# lea de la réplica no se guarda en la caché de respuestas (podría ser anterior a la escritura).
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_COOKIE = "db_primary_until"
+_last_write_at = 0.0
+
+
 # Base: Clase padre de la que heredarán todos nuestros modelos (tablas).
 # Esto permite a SQLAlchemy saber qué clases son tablas de base de datos.
 class Base(DeclarativeBase):
@@ -38,4 +120,40 @@ def get_db():
     try:
         yield db #no se pone return ya que terminaría la función. Con yield(Expresión generadora) hace una pausa y cuando el endpoint lo termine de usar entonces entra finally.
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# True si esta petición debe leer del primario: no hay réplica o el cliente escribió hace poco.
+def reads_from_primary(request: Request) -> bool:
+    if async_read_engine is async_engine:
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+# True si un resultado leído de la réplica puede no incluir la última escritura de este proceso.
+def replica_may_lag() -> bool:
+    return time.monotonic() - _last_write_at < READ_YOUR_WRITES_SECONDS
+
+
+# Versión asíncrona de get_db para los endpoints 'async def' de solo lectura.
+# Con réplica, lee de ella salvo que el cliente tenga que ver sus propias escrituras.
+async def get_async_db(request: Request):
+    primary = reads_from_primary(request)
+    request.state.read_replica = not primary
+    async with (AsyncSessionLocal if primary else AsyncReadSessionLocal)() as db:
+        yield db
+
+
+# Sesión para los endpoints que escriben (toda la transacción en la conexión de escritura).
+# Con réplica, marca al cliente para que sus siguientes lecturas vayan al primario.
+async def get_async_write_db(response: Response):
+    global _last_write_at
+    if async_read_engine is not async_engine:
+        _last_write_at = time.monotonic()
+        response.set_cookie(PRIMARY_COOKIE, f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}",
+                            max_age=ceil(READ_YOUR_WRITES_SECONDS), httponly=True, samesite="lax")
+    async with AsyncWriteSessionLocal() as db:
+        yield db
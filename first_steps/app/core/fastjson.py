@@ -0,0 +1,24 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el json de la librería estándar.
+    orjson = None
+
+# Serialización JSON rápida para respuestas ya validadas.
+# orjson genera bytes directamente (sin pasar por str) y es varias veces más rápido
+# que json.dumps con estructuras de dicts/listas como las de los listados de posts.
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Respuesta JSON que serializa con dumps() en lugar de json.dumps.
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,176 @@
+import os
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import Engine, Select, column, false, func, literal_column, or_, table
+from sqlalchemy.sql import ColumnElement
+
+# Búsqueda de texto completo (full-text) sobre título y contenido de los posts.
+# Un LIKE '%texto%' no puede usar índices (el comodín inicial obliga a recorrer toda la tabla);
+# un índice invertido sí: por cada palabra guarda la lista de posts que la contienen.
+#  - SQLite: tabla virtual FTS5 'posts_fts', sincronizada con triggers.
+#  - Postgres: índice GIN sobre to_tsvector(título + contenido); se actualiza solo.
+#  - Otros motores (o SQLite compilado sin FTS5): se recurre a LIKE sobre título y contenido.
+
+# Configuración de idioma de Postgres ('simple' no aplica stemming, 'spanish' sí).
+FULLTEXT_LANGUAGE = os.getenv("FULLTEXT_LANGUAGE", "simple")
+if not re.fullmatch(r"[a-z_]+", FULLTEXT_LANGUAGE):
+    raise ValueError("FULLTEXT_LANGUAGE inválido")
+
+# Palabras del texto buscado (letras, números y guion bajo, incluyendo acentos).
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Referencia ligera a la tabla virtual FTS5 (no es un modelo: no la crea create_all).
+posts_fts = table("posts_fts", column("rowid"))
+
+
+def _words(query: str) -> List[str]:
+    return _WORD_RE.findall(query)
+
+
+# Backend por defecto: LIKE sobre título y contenido, sin ranking.
+class LikeBackend:
+    name = "like"
+    ranked = False
+
+    def setup(self, engine: Engine) -> bool:
+        return True
+
+    # Aplica el filtro de búsqueda a la consulta 'stmt' (un SELECT sobre posts).
+    # Devuelve (consulta filtrada, expresión de relevancia o None). La relevancia
+    # se ordena ASC: valores menores = más relevante.
+    def apply(self, stmt: Select, query: str) -> Tuple[Select, Optional[ColumnElement]]:
+        from app.models import PostORM
+        pattern = f"%{query}%"
+        return stmt.where(or_(PostORM.title.ilike(pattern), PostORM.content.ilike(pattern))), None
+
+
+class SQLiteFTS5Backend(LikeBackend):
+    name = "sqlite-fts5"
+    ranked = True
+
+    # Tabla FTS5 de "contenido externo": no duplica el texto, lo lee de 'posts' por rowid=id.
+    # remove_diacritics: 'canción' y 'cancion' se indexan igual.
+    DDL = [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+            title, content, content='posts', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        # Triggers: mantienen el índice en la misma transacción que el INSERT/UPDATE/DELETE.
+        """CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    ]
+
+    # Peso de cada columna en bm25: una coincidencia en el título cuenta más que en el contenido.
+    TITLE_WEIGHT = 10.0
+    CONTENT_WEIGHT = 1.0
+
+    def setup(self, engine: Engine) -> bool:
+        with engine.begin() as conn:
+            options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+            if "ENABLE_FTS5" not in options:
+                return False
+
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+            ).first()
+            for statement in self.DDL:
+                conn.exec_driver_sql(statement)
+            # Si el índice es nuevo, se indexan los posts que ya existían.
+            if not exists:
+                conn.exec_driver_sql("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+        return True
+
+    def apply(self, stmt: Select, query: str):
+        from app.models import PostORM
+        words = _words(query)
+        if not words:
+            return stmt.where(false()), None
+
+        # Cada palabra entre comillas (evita interpretar operadores de FTS5) y con '*'
+        # para buscar por prefijo: "fast" encuentra "fastapi". Todas deben aparecer (AND).
+        fts_query = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+        fts = literal_column("posts_fts")
+        stmt = stmt.join(posts_fts, posts_fts.c.rowid == PostORM.id).where(fts.match(fts_query))
+        # bm25 devuelve valores más negativos cuanto más relevante: se ordena ASC.
+        return stmt, func.bm25(fts, self.TITLE_WEIGHT, self.CONTENT_WEIGHT)
+
+
+class PostgresTSVectorBackend(LikeBackend):
+    name = "postgres-tsvector"
+    ranked = True
+
+    # El idioma va como literal (no como parámetro): la expresión tiene que ser idéntica
+    # a la del índice para que el planner lo use.
+    _language = literal_column(f"'{FULLTEXT_LANGUAGE}'::regconfig")
+
+    def _document(self):
+        from app.models import PostORM
+        # setweight: el título pesa más (A) que el contenido (D) en ts_rank.
+        return func.setweight(func.to_tsvector(self._language, PostORM.title), literal_column("'A'")).op("||")(
+            func.setweight(func.to_tsvector(self._language, PostORM.content), literal_column("'D'"))
+        )
+
+    def setup(self, engine: Engine) -> bool:
+        # Índice de expresión: Postgres lo mantiene al insertar/actualizar/borrar, sin triggers.
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_posts_fulltext ON posts USING GIN (("
+                f"setweight(to_tsvector('{FULLTEXT_LANGUAGE}'::regconfig, title), 'A') || "
+                f"setweight(to_tsvector('{FULLTEXT_LANGUAGE}'::regconfig, content), 'D')"
+                "))"
+            )
+        return True
+
+    def apply(self, stmt: Select, query: str):
+        words = _words(query)
+        if not words:
+            return stmt.where(false()), None
+
+        # 'palabra:*' busca por prefijo; '&' exige todas las palabras.
+        tsquery = func.to_tsquery(self._language, " & ".join(f"{word}:*" for word in words))
+        document = self._document()
+        # ts_rank devuelve valores mayores cuanto más relevante: se ordena por -rank ASC.
+        return stmt.where(document.op("@@")(tsquery)), -func.ts_rank(document, tsquery)
+
+
+_BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "postgresql": PostgresTSVectorBackend,
+}
+
+# Backend activo por dialecto: lo registran setup_fulltext() (migración) o activate_fulltext() (arranque).
+_active: dict = {}
+
+
+# Crea el índice de texto completo (si no existe) para el motor dado y registra el backend.
+# Lo ejecuta la migración correspondiente (app/core/migrations.py), después de crear las tablas.
+def setup_fulltext(engine: Engine):
+    dialect = engine.dialect.name
+    backend = _BACKENDS.get(dialect, LikeBackend)()
+    if not backend.setup(engine):
+        backend = LikeBackend()
+    _active[dialect] = backend
+    return backend
+
+
+# Registra al arrancar el backend que dejó preparado la migración (por nombre), sin tocar la BD.
+def activate_fulltext(dialect: str, name: Optional[str]) -> None:
+    for backend_class in (*_BACKENDS.values(), LikeBackend):
+        if backend_class.name == name:
+            _active[dialect] = backend_class()
+            return
+    _active[dialect] = LikeBackend()
+
+
+# Backend a usar en una consulta. Si no se registró ninguno para ese dialecto
+# (p. ej. en un script), se usa LIKE, que siempre funciona.
+def get_fulltext_backend(dialect: str):
+    return _active.get(dialect) or LikeBackend()
@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import os
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from app.core.db import AsyncWriteSessionLocal
+from app.core.sql_timing import QueryStats, collect_query_stats, current_query_stats
+
+# Group commit: agrupa las escrituras concurrentes en una sola transacción.
+# En SQLite hay un único escritor: cada petición de escritura espera su turno y paga su propio
+# BEGIN + flush + COMMIT (con su fsync). Con el coalescedor, las escrituras que llegan casi a la
+# vez (dentro de WRITE_GROUP_COMMIT_WINDOW_MS) se ejecutan seguidas en una transacción y se
+# confirman con un solo COMMIT.
+#
+# Una escritura es una "operación": función síncrona que recibe la Session, hace su trabajo
+# (sin commit) y devuelve datos ya serializables (no objetos ORM). Si una operación del lote
+# falla (p. ej. título duplicado), se deshace el lote y se repite cada operación en su propia
+# transacción: cada petición recibe su resultado o su excepción, como si no hubiera lote.
+# Por eso las operaciones tienen que poder ejecutarse dos veces (no tocar nada fuera de la BD).
+#
+# El SQL lo ejecuta el worker, no la petición: el tiempo en BD de cada operación (más el COMMIT
+# que ha esperado) se mide aparte y se devuelve con el resultado, para que cuente en el
+# Server-Timing de la petición que la envió.
+#
+# Variables de entorno:
+#  - WRITE_GROUP_COMMIT: true para activarlo (por defecto, cada petición hace su commit).
+#  - WRITE_GROUP_COMMIT_WINDOW_MS: cuánto espera el lote a que lleguen más escrituras.
+#  - WRITE_GROUP_COMMIT_MAX_BATCH: máximo de operaciones por transacción.
+
+WRITE_GROUP_COMMIT = os.getenv("WRITE_GROUP_COMMIT", "false").lower() == "true"
+WRITE_GROUP_COMMIT_WINDOW_MS = float(os.getenv("WRITE_GROUP_COMMIT_WINDOW_MS", "2"))
+WRITE_GROUP_COMMIT_MAX_BATCH = int(os.getenv("WRITE_GROUP_COMMIT_MAX_BATCH", "64"))
+
+Operation = Callable[[Session], Any]
+
+
+class GroupCommitWriter:
+    def __init__(self, session_factory: async_sessionmaker, enabled: bool, window_ms: float, max_batch: int):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+
+    # Encola la operación y espera a que su lote se confirme.
+    async def submit(self, operation: Operation) -> Any:
+        loop = asyncio.get_running_loop()
+        # El worker se arranca en el primer uso, en el event loop actual (cada loop tiene el suyo:
+        # p. ej. el TestClient de los scripts crea uno nuevo).
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # Contexto vacío: si no, el worker heredaría las variables de contexto de la petición
+            # que lo arranca (y todo su SQL contaría en las estadísticas de esa petición).
+            self._worker = loop.create_task(self._run(), context=contextvars.Context())
+        future = loop.create_future()
+        await self._queue.put((operation, future))
+        result, stats = await future
+        request_stats = current_query_stats()
+        if request_stats is not None:
+            request_stats.add(stats)
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+            except Exception as exc:  # no debería pasar: _commit_batch ya reparte los errores
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    # Flush tras cada operación: la siguiente ve sus cambios (p. ej. un post ya borrado).
+    # Devuelve pares (resultado, consultas de esa operación).
+    @staticmethod
+    def _run_all(session: Session, operations: List[Operation]) -> List[Tuple[Any, QueryStats]]:
+        results = []
+        for operation in operations:
+            with collect_query_stats() as stats:
+                result = operation(session)
+                session.flush()
+            results.append((result, stats))
+        return results
+
+    async def _commit_batch(self, batch: List[Tuple[Operation, asyncio.Future]]) -> None:
+        if len(batch) > 1:
+            async with self.session_factory() as db:
+                try:
+                    results = await db.run_sync(self._run_all, [operation for operation, _ in batch])
+                    with collect_query_stats() as commit_stats:
+                        await db.commit()
+                except Exception:
+                    await db.rollback()
+                else:
+                    for (_, future), (result, stats) in zip(batch, results):
+                        stats.add(commit_stats)
+                        if not future.done():
+                            future.set_result((result, stats))
+                    return
+
+        # Una sola operación, o el lote falló: cada una en su propia transacción.
+        for operation, future in batch:
+            async with self.session_factory() as db:
+                try:
+                    with collect_query_stats() as stats:
+                        result = await run_operation(db, operation)
+                except Exception as exc:
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    if not future.done():
+                        future.set_result((result, stats))
+
+
+# Ejecuta una operación en la sesión y hace commit (rollback si falla).
+async def run_operation(db: AsyncSession, operation: Operation) -> Any:
+    try:
+        result = await db.run_sync(operation)
+        await db.commit()
+        return result
+    except Exception:
+        await db.rollback()
+        raise
+
+
+write_coalescer = GroupCommitWriter(
+    AsyncWriteSessionLocal, WRITE_GROUP_COMMIT, WRITE_GROUP_COMMIT_WINDOW_MS, WRITE_GROUP_COMMIT_MAX_BATCH)
+
+
+# Punto de entrada de los endpoints: con group commit la operación va al lote;
+# si no, se ejecuta en la sesión de la petición con su propio commit.
+async def run_write(db: AsyncSession, operation: Operation) -> Any:
+    if write_coalescer.enabled:
+        return await write_coalescer.submit(operation)
+    return await run_operation(db, operation)
@@ -0,0 +1,253 @@
+import os
+from typing import Dict, List
+from sqlalchemy import Column, Engine, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+# Migraciones versionadas del esquema.
+# Se ejecutan aparte, con 'python -m app.manage migrate', no al arrancar la API: el arranque
+# solo lee la versión guardada (una consulta) en lugar de reflejar todas las tablas con create_all.
+#
+# La versión aplicada se guarda en la tabla 'schema_info' (clave -> valor), junto con otros
+# datos que el arranque necesita sin consultar el catálogo (p. ej. el backend de texto completo).
+#
+# Para cambiar el esquema: añadir una función al final de MIGRATIONS (nunca reordenar ni borrar).
+# Cada paso es idempotente (comprueba antes si ya está aplicado): una BD creada antes de
+# existir las migraciones (con create_all) se pone al día ejecutándolas todas.
+
+# MIGRATE_ON_STARTUP=true aplica las migraciones pendientes al arrancar (cómodo en desarrollo).
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() == "true"
+
+schema_info = Table(
+    "schema_info",
+    MetaData(),
+    Column("key", String(50), primary_key=True),
+    Column("value", String(200), nullable=False),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+# Tablas iniciales. En una BD nueva crea ya el esquema actual completo (los pasos siguientes
+# no tendrán nada que hacer); en una existente solo añade las tablas que falten.
+def _create_tables(engine: Engine) -> None:
+    import app.models  # noqa: F401 -- se importa por su efecto: registra todos los modelos en Base.metadata
+    from app.core.db import Base
+
+    Base.metadata.create_all(bind=engine)
+
+
+# tags.name_key: clave normalizada (casefold) con índice único.
+# Si al normalizar aparecen duplicados ("Python" y "python"), se fusionan en el tag más antiguo.
+def _add_tag_name_key(engine: Engine) -> None:
+    from app.models.tag import normalize_tag_name
+
+    columns = {column["name"] for column in inspect(engine).get_columns("tags")}
+    if "name_key" in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE tags ADD COLUMN name_key VARCHAR(30)"))
+
+        first_by_key = {}
+        for tag_id, name in conn.execute(text("SELECT id, name FROM tags ORDER BY id")).all():
+            key = normalize_tag_name(name)
+            if key not in first_by_key:
+                first_by_key[key] = tag_id
+                conn.execute(text("UPDATE tags SET name_key = :key WHERE id = :id"), {"key": key, "id": tag_id})
+                continue
+
+            # Tag duplicado: sus posts pasan al tag original y se elimina.
+            keep = first_by_key[key]
+            conn.execute(text(
+                "UPDATE post_tags SET tag_id = :keep WHERE tag_id = :dup AND post_id NOT IN "
+                "(SELECT post_id FROM post_tags WHERE tag_id = :keep)"
+            ), {"keep": keep, "dup": tag_id})
+            conn.execute(text("DELETE FROM post_tags WHERE tag_id = :dup"), {"dup": tag_id})
+            conn.execute(text("DELETE FROM tags WHERE id = :dup"), {"dup": tag_id})
+
+        conn.execute(text("CREATE UNIQUE INDEX ix_tags_name_key ON tags (name_key)"))
+
+
+# Índice (tag_id, post_id) en post_tags: create_all no añade índices a tablas que ya existen.
+def _add_post_tags_tag_index(engine: Engine) -> None:
+    indexes = {index["name"] for index in inspect(engine).get_indexes("post_tags")}
+    if "ix_post_tags_tag_id_post_id" in indexes:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_post_tags_tag_id_post_id ON post_tags (tag_id, post_id)"))
+
+
+# La tabla 'counters' se crea vacía en una BD que ya tenía posts: se calcula una vez.
+def _init_counters(engine: Engine) -> None:
+    from sqlalchemy.orm import Session
+    from app.api.v1.post.counters import read_total_posts, rebuild_counters
+
+    with Session(engine) as db:
+        if read_total_posts(db) is None:
+            rebuild_counters(db)
+            db.commit()
+
+
+# Índice de texto completo (FTS5 / tsvector). Guarda qué backend quedó activo: si SQLite no
+# tiene FTS5 se usará LIKE, y el arranque lo sabe sin volver a comprobarlo.
+def _setup_fulltext(engine: Engine) -> None:
+    from app.core.fulltext import setup_fulltext
+
+    backend = setup_fulltext(engine)
+    with engine.begin() as conn:
+        _set_info(conn, "fulltext", backend.name)
+
+
+# Cuentas que antes estaban en memoria (FAKE_USERS).
+LEGACY_USERS = [
+    ("alessandro@gmail.com", "alessandro", "password123"),
+    ("alumno@example.com", "alumno", "password123"),
+]
+
+
+# Tabla de usuarios con contraseñas hasheadas (antes estaban en memoria, en claro).
+# Las cuentas se dan de alta con 'python -m app.manage create-user'.
+# Una instalación anterior a esta tabla (ya tiene posts o autores) recibe las cuentas de
+# LEGACY_USERS con su contraseña hasheada: al actualizar se sigue pudiendo entrar con ellas.
+# Una instalación nueva empieza sin cuentas (ninguna con contraseña conocida).
+def _create_users_table(engine: Engine) -> None:
+    from sqlalchemy.orm import Session
+    from app.api.v1.auth.repository import UserRepository
+    from app.core.passwords import hash_password
+    from app.models import AuthorORM, PostORM, UserORM
+
+    UserORM.__table__.create(bind=engine, checkfirst=True)
+
+    with Session(engine) as db:
+        has_users = db.scalar(select(UserORM.id).limit(1)) is not None
+        has_data = (db.scalar(select(PostORM.id).limit(1)) is not None
+                    or db.scalar(select(AuthorORM.id).limit(1)) is not None)
+        if has_users or not has_data:
+            return
+        repository = UserRepository(db)
+        for email, username, password in LEGACY_USERS:
+            repository.create(email, username, hash_password(password))
+        db.commit()
+
+
+# Tokens revocados (logout y revocación por un administrador), consultados al arrancar.
+def _create_revoked_tokens_table(engine: Engine) -> None:
+    from app.models import RevokedTokenORM
+
+    RevokedTokenORM.__table__.create(bind=engine, checkfirst=True)
+
+
+# users.is_admin: create_all no añade columnas a tablas que ya existen.
+def _add_user_is_admin(engine: Engine) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns("users")}
+    if "is_admin" in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE users ADD COLUMN is_admin BOOLEAN NOT NULL DEFAULT false"))
+
+
+# posts.version (control de concurrencia optimista). Los posts existentes empiezan en 1.
+def _add_post_version(engine: Engine) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns("posts")}
+    if "version" in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE posts ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+# Índice (lower(title), id) para paginar por keyset el listado ordenado por título.
+# IF NOT EXISTS: inspect() no devuelve los índices sobre expresiones en SQLite.
+def _add_post_title_lower_index(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_posts_title_lower_id ON posts (lower(title), id)"))
+
+
+# tags.name_key pasa de VARCHAR(30) a VARCHAR(90): al normalizar con casefold() la clave puede
+# ser más larga que el nombre. SQLite no aplica la longitud de VARCHAR: solo hace falta en el resto.
+def _widen_tag_name_key(engine: Engine) -> None:
+    if engine.dialect.name == "sqlite":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE tags ALTER COLUMN name_key TYPE VARCHAR(90)"))
+
+
+# posts.uid (parte del ETag). Los posts existentes comparten '0': sus ids son todos distintos
+# y los posts nuevos reciben un uid aleatorio de 16 caracteres, que nunca coincide con él.
+def _add_post_uid(engine: Engine) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns("posts")}
+    if "uid" in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE posts ADD COLUMN uid VARCHAR(16) NOT NULL DEFAULT '0'"))
+
+
+# (versión, descripción, función). La versión del esquema es la de la última.
+MIGRATIONS = [
+    (1, "Tablas iniciales", _create_tables),
+    (2, "tags.name_key normalizado y único", _add_tag_name_key),
+    (3, "Índice (tag_id, post_id) en post_tags", _add_post_tags_tag_index),
+    (4, "Contadores de posts y tags", _init_counters),
+    (5, "Índice de texto completo", _setup_fulltext),
+    (6, "Tabla de usuarios", _create_users_table),
+    (7, "Tabla de tokens revocados", _create_revoked_tokens_table),
+    (8, "users.is_admin", _add_user_is_admin),
+    (9, "posts.version", _add_post_version),
+    (10, "Índice (lower(title), id) en posts", _add_post_title_lower_index),
+    (11, "tags.name_key VARCHAR(90)", _widen_tag_name_key),
+    (12, "posts.uid", _add_post_uid),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _set_info(conn, key: str, value: str) -> None:
+    updated = conn.execute(schema_info.update().where(schema_info.c.key == key).values(value=value))
+    if updated.rowcount == 0:
+        conn.execute(schema_info.insert().values(key=key, value=value))
+
+
+# Lee 'schema_info' en una sola consulta. Diccionario vacío si la BD aún no tiene migraciones.
+def read_schema_info(engine: Engine) -> Dict[str, str]:
+    try:
+        with engine.connect() as conn:
+            return dict(conn.execute(select(schema_info.c.key, schema_info.c.value)).all())
+    except (OperationalError, ProgrammingError):  # la tabla aún no existe
+        return {}
+
+
+def current_version(engine: Engine) -> int:
+    return int(read_schema_info(engine).get("version", 0))
+
+
+# Aplica en orden las migraciones pendientes. Devuelve las descripciones de las aplicadas.
+def migrate(engine: Engine) -> List[str]:
+    schema_info.create(bind=engine, checkfirst=True)
+    version = current_version(engine)
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        step(engine)
+        with engine.begin() as conn:
+            _set_info(conn, "version", str(number))
+        applied.append(f"{number}: {description}")
+    return applied
+
+
+# Comprobación del arranque: una consulta. Falla si la BD va por detrás del código.
+# Una BD más nueva se acepta (las migraciones solo añaden; permite desplegar por fases).
+def check_schema_version(engine: Engine) -> Dict[str, str]:
+    info = read_schema_info(engine)
+    version = int(info.get("version", 0))
+    if version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"La base de datos está en la versión {version} del esquema y la aplicación necesita la "
+            f"{SCHEMA_VERSION}. Ejecuta 'python -m app.manage migrate'."
+        )
+    return info
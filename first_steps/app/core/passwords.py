@@ -0,0 +1,91 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Hash de contraseñas con scrypt (hashlib, sin dependencias extra).
+# scrypt es caro a propósito (CPU y memoria): en el event loop bloquearía todas las peticiones
+# mientras dura. Por eso las funciones async lo ejecutan en un pool de hilos acotado
+# (hashlib suelta el GIL durante el cálculo, así que los hilos sí trabajan en paralelo).
+#
+# Formato guardado: scrypt$n$r$p$salt$hash (salt y hash en base64). Los parámetros van en el
+# propio hash: si se suben los costes, los hashes antiguos se siguen verificando con los suyos
+# y needs_rehash() indica que hay que recalcularlos en el siguiente login correcto.
+#
+# Variables de entorno:
+#  - PASSWORD_SCRYPT_N / PASSWORD_SCRYPT_R / PASSWORD_SCRYPT_P: coste de scrypt.
+#  - PASSWORD_HASH_WORKERS: hilos del pool (cálculos de hash simultáneos como máximo).
+
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_SALT_BYTES = 16
+_HASH_BYTES = 32
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem: scrypt necesita unos 128 * n * r bytes; el límite por defecto de OpenSSL (32 MiB) se queda corto.
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=_HASH_BYTES)
+
+
+def hash_password(password: str) -> str:
+    salt = os.urandom(_SALT_BYTES)
+    digest = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+# Comparación en tiempo constante. Un hash con formato desconocido nunca coincide.
+def verify_password(password: str, stored: str) -> bool:
+    try:
+        scheme, n, r, p, salt, digest = stored.split("$")
+        if scheme != "scrypt":
+            return False
+        expected = base64.b64decode(digest)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+# True si el hash se calculó con otros parámetros de coste que los actuales.
+def needs_rehash(stored: str) -> bool:
+    return not stored.startswith(f"scrypt${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$")
+
+
+# Hash válido de una contraseña aleatoria: se verifica contra él cuando el usuario no existe,
+# para que el login tarde lo mismo y no revele qué emails están registrados.
+# Lo calcula warm_up_password_hashing() al arrancar la app: así el primer login con un email
+# desconocido no paga un hash extra (que lo haría más lento y volvería a delatarlo).
+_dummy_hash = None
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_executor, verify_password, password, stored)
+
+
+# Se llama en el lifespan de la app: calcula el hash ficticio en el pool (de paso arranca su primer hilo).
+async def warm_up_password_hashing() -> None:
+    global _dummy_hash
+    _dummy_hash = await hash_password_async(_b64(os.urandom(_SALT_BYTES)))
+
+
+async def verify_dummy_password_async(password: str) -> bool:
+    if _dummy_hash is None:
+        raise RuntimeError("Falta warm_up_password_hashing(): se llama al arrancar la app")
+    await verify_password_async(password, _dummy_hash)
+    return False
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from typing import Dict, Optional
+from sqlalchemy import Engine, delete, select
+from sqlalchemy.exc import IntegrityError
+
+# Lista de tokens revocados (denylist) sin consultas en cada petición.
+# Los tokens llevan un identificador único (claim 'jti'). Al revocar uno se guarda en la tabla
+# 'revoked_tokens' y en memoria; get_current_user solo mira la memoria:
+#  - Filtro de Bloom: unos bits por entrada. Si dice "no está" es seguro (sin falsos negativos),
+#    que es la respuesta de casi todas las peticiones. Cuesta un hash y unas lecturas de bits.
+#  - Diccionario exacto jti -> exp: resuelve los falsos positivos del filtro.
+# Las entradas se podan cuando el token caduca (ya no valdría de todas formas): en memoria y en la BD.
+#
+# Con varios procesos, cada uno vuelve a leer cada TOKEN_DENYLIST_SYNC_SECONDS todas las
+# revocaciones vigentes (son pocas: caducan con el token) y añade las que no conocía.
+# No se usa "filas con id mayor que la última vista": la BD reutiliza los ids de las filas
+# podadas y, con transacciones concurrentes, un id menor puede confirmarse después.
+# En ese intervalo otro proceso aún aceptaría el token.
+#
+# Variables de entorno:
+#  - TOKEN_DENYLIST_CAPACITY: entradas previstas (tamaño inicial del filtro; crece si se supera).
+#  - TOKEN_DENYLIST_FALSE_POSITIVE_RATE: tasa de falsos positivos del filtro.
+#  - TOKEN_DENYLIST_SYNC_SECONDS: intervalo de sincronización y poda.
+
+TOKEN_DENYLIST_CAPACITY = int(os.getenv("TOKEN_DENYLIST_CAPACITY", "10000"))
+TOKEN_DENYLIST_FALSE_POSITIVE_RATE = float(os.getenv("TOKEN_DENYLIST_FALSE_POSITIVE_RATE", "0.001"))
+TOKEN_DENYLIST_SYNC_SECONDS = float(os.getenv("TOKEN_DENYLIST_SYNC_SECONDS", "10"))
+
+logger = logging.getLogger("app.revocation")
+
+
+# Filtro de Bloom con doble hash (Kirsch-Mitzenmacher): k posiciones a partir de un solo blake2b.
+class BloomFilter:
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenDenylist:
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self._filter = BloomFilter(capacity, false_positive_rate)
+        self._entries: Dict[str, int] = {}
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti or jti not in self._filter:
+            return False
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, jti: str, expires_at: int) -> None:
+        self._entries[jti] = expires_at
+        self._filter.add(jti)
+        if len(self._entries) > self.capacity:
+            self._rebuild()
+
+    # Un filtro de Bloom no permite quitar elementos: se reconstruye con las entradas vigentes
+    # (y con más capacidad si se ha superado la prevista, para no disparar los falsos positivos).
+    def _rebuild(self) -> None:
+        self.capacity = max(self.capacity, 2 * len(self._entries))
+        bloom = BloomFilter(self.capacity, self.false_positive_rate)
+        for jti in self._entries:
+            bloom.add(jti)
+        self._filter = bloom
+
+    # Quita de memoria los tokens ya caducados. Devuelve cuántos se han quitado.
+    def prune(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+        for jti in expired:
+            del self._entries[jti]
+        if expired:
+            self._rebuild()
+        return len(expired)
+
+    # Carga todas las revocaciones vigentes guardadas (una consulta) y añade las que este
+    # proceso no conocía. Una revocación no se deshace: nunca se quita nada de memoria aquí.
+    # Devuelve cuántas eran nuevas.
+    def load(self, conn) -> int:
+        from app.models import RevokedTokenORM
+
+        rows = conn.execute(
+            select(RevokedTokenORM.jti, RevokedTokenORM.expires_at)
+            .where(RevokedTokenORM.expires_at > int(time.time()))
+        ).all()
+        new = 0
+        for jti, expires_at in rows:
+            if jti not in self._entries:
+                self.add(jti, expires_at)
+                new += 1
+        return new
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+denylist = TokenDenylist(TOKEN_DENYLIST_CAPACITY, TOKEN_DENYLIST_FALSE_POSITIVE_RATE)
+
+
+# Revoca un token: lo guarda en la BD (para reinicios y otros procesos) y en la lista en memoria.
+# Revocar dos veces el mismo token no es un error.
+async def revoke_token(db, jti: str, expires_at: int) -> None:
+    from app.models import RevokedTokenORM
+
+    db.add(RevokedTokenORM(jti=jti, expires_at=int(expires_at)))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+    denylist.add(jti, int(expires_at))
+
+
+# Arranque: carga las revocaciones vigentes.
+def load_denylist(engine: Engine) -> None:
+    with engine.connect() as conn:
+        denylist.load(conn)
+
+
+# Sincronización periódica (tarea de fondo del lifespan de la app): carga las revocaciones
+# de otros procesos y poda las caducadas, en memoria y en la tabla.
+async def sync_denylist_forever(async_engine, write_engine) -> None:
+    from app.models import RevokedTokenORM
+
+    while True:
+        await asyncio.sleep(TOKEN_DENYLIST_SYNC_SECONDS)
+        try:
+            async with async_engine.connect() as conn:
+                await conn.run_sync(denylist.load)
+            if denylist.prune():
+                async with write_engine.begin() as conn:
+                    await conn.execute(delete(RevokedTokenORM).where(RevokedTokenORM.expires_at <= int(time.time())))
+        except Exception:
+            logger.exception("No se pudo sincronizar la lista de tokens revocados")
@@ -1,10 +1,17 @@
 import os
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta,timezone
 from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
-import jwt
 from fastapi import Depends, HTTPException, status
-from jwt import ExpiredSignatureError, InvalidTokenError
+from app.core.revocation import denylist
+
+# PyJWT se importa dentro de las funciones que lo usan: al importarse carga también ssl y
+# urllib (cliente JWKS), que no hacen falta para arrancar, solo al firmar o verificar un token.
 
 
 # Configuración de seguridad.
@@ -13,6 +20,10 @@ SECRET_KEY = os.getenv("SECRET_KEY","change_me_in_production")
 ALGORITHM = "HS256" # Algoritmo de encriptación (HMAC con SHA-256)
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Caché de tokens ya verificados. TOKEN_CACHE_SIZE=0 la desactiva.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
 # OAuth2PasswordBearer: Esquema de seguridad que le dice a FastAPI que el cliente
 # debe enviar el token en el header "Authorization: Bearer <token>".
 # tokenUrl: URL relativa donde el cliente puede obtener el token (login).
@@ -47,29 +58,130 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     # Define la fecha de expiración.
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # jti: identificador único del token, para poder revocarlo antes de que caduque.
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16)})
     # Codifica el diccionario a un string JWT firmado.
+    import jwt
     token = jwt.encode(payload=to_encode, key=SECRET_KEY, algorithm=ALGORITHM)
     return token
 
 
 # Decodifica y valida la firma del token.
 def decode_token(token: str)-> dict:
+    import jwt
     playload = jwt.decode(jwt=token, key=SECRET_KEY, algorithms=[ALGORITHM])
     return playload
 
 
+# Caché LRU con caducidad (TTL) de los claims de tokens ya verificados.
+# Un cliente manda el mismo token en cada petición; así la verificación HMAC y el parseo
+# del JSON se hacen una vez y las siguientes peticiones solo calculan un sha256.
+#  - La clave es el hash del token (no se guarda el token en memoria).
+#  - Cada entrada caduca como muy tarde en el 'exp' del token: pasado ese momento se
+#    vuelve a decodificar y PyJWT lanza ExpiredSignatureError como siempre.
+#  - Si cambia SECRET_KEY la caché se vacía: los tokens firmados con la clave anterior
+#    tienen que fallar la verificación.
+class TokenCache:
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._secret = SECRET_KEY
+        # FastAPI ejecuta dependencias síncronas en hilos: se protege el OrderedDict.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _check_secret(self) -> None:
+        if self._secret != SECRET_KEY:
+            self._entries.clear()
+            self._secret = SECRET_KEY
+
+    def get(self, token: str) -> Optional[dict]:
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            self._check_secret()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            # Marca la entrada como usada recientemente (LRU).
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self._key(token)
+        with self._lock:
+            self._check_secret()
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            # Expulsa las entradas menos usadas si se supera el tamaño máximo.
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
+
+# Cambia la clave de firma (rotación) e invalida la caché de tokens verificados.
+def rotate_secret_key(new_secret: str) -> None:
+    global SECRET_KEY
+    SECRET_KEY = new_secret
+    token_cache.clear()
+
+
+# Decodifica el token usando la caché: solo verifica la firma si no está cacheado.
+def verify_token(token: str) -> dict:
+    playload = token_cache.get(token)
+    if playload is None:
+        playload = decode_token(token)
+        token_cache.set(token, playload)
+    return playload
+
+
+def raise_revoked_token():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token revocado",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
 # Dependencia para obtener el usuario actual a partir del token.
 # Se ejecuta en cada endpoint protegido para validar la sesión.
+# La comprobación de revocación es en memoria (app/core/revocation.py): no hace consultas.
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    import jwt
     try:
-        playload = decode_token(token)
+        playload = verify_token(token)
         sub: Optional[str] = playload.get("sub")
         username: Optional[str] = playload.get("username")
         if not sub or not username:
             raise credentials_exc
-        return {"email": sub, "username": username}
-    except ExpiredSignatureError:
+        if denylist.is_revoked(playload.get("jti")):
+            raise raise_revoked_token()
+        return {"email": sub, "username": username, "jti": playload.get("jti"),
+                "exp": playload.get("exp"), "admin": bool(playload.get("admin"))}
+    except jwt.ExpiredSignatureError:
         raise raise_expired_token()
     except jwt.InvalidTokenError:
         raise credentials_exc
\ No newline at end of file
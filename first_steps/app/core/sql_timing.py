@@ -0,0 +1,116 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import Engine, event
+
+# Instrumentación de SQL: sustituye a echo=True.
+# echo=True formatea y escribe cada sentencia en el log de forma síncrona, también en producción.
+# Aquí solo se miden tiempos (dos llamadas a perf_counter por sentencia) y se acumulan por petición:
+#  - Cabecera Server-Timing en cada respuesta: nº de consultas y tiempo total en BD
+#    (se ve en la pestaña "Timing" de las DevTools del navegador).
+#  - Log de consultas lentas (por encima de SLOW_QUERY_MS) con los parámetros ocultos.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+# Estadísticas de SQL de la petición en curso.
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+    def add(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.total_ms += other.total_ms
+
+
+# ContextVar: cada petición (tarea de asyncio o hilo) ve su propio objeto QueryStats.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# Mide aparte las consultas del bloque. Lo usa el código que ejecuta SQL en nombre de una
+# petición desde otra tarea (p. ej. el group commit), para luego sumárselas con add().
+@contextmanager
+def collect_query_stats():
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# El inicio se guarda en el contexto de ejecución de la sentencia (no en la conexión):
+# si la sentencia falla no hay after_cursor_execute, y así no queda nada acumulado.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "Consulta lenta (%.1f ms): %s | parámetros: %s",
+            elapsed_ms, " ".join(statement.split())[:1000], _redact(parameters, executemany))
+
+
+# Los parámetros pueden contener datos personales (emails, contenido...): solo se registra su forma.
+def _redact(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<{len(parameters)} filas ocultas>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}=?" for key in parameters) + "}"
+    return f"<{len(parameters or ())} ocultos>"
+
+
+# Registra los eventos de medición en un engine (para el async: async_engine.sync_engine).
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Middleware ASGI: abre un contador por petición y añade la cabecera Server-Timing.
+# Es ASGI "puro" (no BaseHTTPMiddleware) para no añadir una tarea extra por petición.
+class SQLTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"'.encode("latin-1"),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
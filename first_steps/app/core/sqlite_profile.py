@@ -0,0 +1,48 @@
+import os
+from sqlalchemy import Engine, event
+
+# Perfil de producción para SQLite, aplicado a cada conexión nueva (evento "connect").
+# Con los valores por defecto (journal de rollback, synchronous=FULL, sin busy_timeout)
+# un escritor bloquea a todos los lectores y las ráfagas de escrituras fallan con
+# "database is locked". Con WAL los lectores no esperan al escritor y viceversa.
+#
+# Variables de entorno (SQLITE_PRAGMAS=false desactiva el perfil completo):
+#  - SQLITE_JOURNAL_MODE: WAL por defecto. Se guarda en el fichero: basta con aplicarlo una vez.
+#  - SQLITE_SYNCHRONOUS: NORMAL. En WAL no corrompe la BD; como mucho se pierden las últimas
+#    transacciones confirmadas si se va la luz (no si solo se cae el proceso).
+#  - SQLITE_MMAP_SIZE: bytes del fichero leídos por mmap (menos copias en las lecturas).
+#  - SQLITE_CACHE_SIZE: caché de páginas por conexión. Negativo = KiB (-65536 = 64 MiB).
+#  - SQLITE_BUSY_TIMEOUT_MS: cuánto espera una conexión a que se libere el bloqueo antes de fallar.
+
+SQLITE_PRAGMAS = os.getenv("SQLITE_PRAGMAS", "true").lower() == "true"
+
+PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    # Un cursor funciona igual con sqlite3 y con el adaptador de aiosqlite.
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout primero: cambiar journal_mode también puede tener que esperar un bloqueo.
+        cursor.execute(f"PRAGMA busy_timeout = {PRAGMAS['busy_timeout']}")
+        for name, value in PRAGMAS.items():
+            if name != "busy_timeout":
+                cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+# Registra el perfil en un engine SQLite (para el async: async_engine.sync_engine).
+# En otros motores no hace nada.
+def apply_sqlite_profile(engine: Engine) -> None:
+    if not SQLITE_PRAGMAS or engine.dialect.name != "sqlite":
+        return
+    if event.contains(engine, "connect", _set_pragmas):
+        return
+    event.listen(engine, "connect", _set_pragmas)
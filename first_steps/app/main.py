@@ -1,25 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.core.db import Base, engine
-from dotenv import load_dotenv
+from app.core.db import engine, async_engine, async_write_engine
+from app.core.fulltext import activate_fulltext
+from app.core.migrations import MIGRATE_ON_STARTUP, check_schema_version, migrate
+from app.core.passwords import warm_up_password_hashing
+from app.core.revocation import load_denylist, sync_denylist_forever
+from app.core.sql_timing import SQLTimingMiddleware
+from app.core.admission import AdmissionControlMiddleware, route_table
 from app.api.v1.post.router import router as post_router
+from app.api.v1.tag.router import router as tag_router
 # Si el archivo auth/router.py no existe, comenta la siguiente línea:
 from app.api.v1.auth.router import router as auth_router
+from app.api.v1.monitoring.router import router as monitoring_router
 
-load_dotenv()
+# El fichero .env se carga en app/__init__.py, antes de que los módulos lean su configuración.
+
+
+# Tareas de fondo mientras la app está en marcha: sincronizar y podar los tokens revocados.
+# Antes de aceptar peticiones se calcula el hash ficticio del login (ver passwords.py).
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_password_hashing()
+    task = asyncio.create_task(sync_denylist_forever(async_engine, async_write_engine))
+    try:
+        yield
+    finally:
+        task.cancel()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Mini Blog")
+    app = FastAPI(title="Mini Blog", lifespan=lifespan)
     
-    # Crea las tablas en la base de datos si no existen.
-    # NOTA: En producción, esto se suele reemplazar por migraciones con Alembic.
-    Base.metadata.create_all(bind=engine)
+    # El esquema lo crean/actualizan las migraciones ('python -m app.manage migrate').
+    # Al arrancar solo se lee la versión (una consulta) y el backend de texto completo preparado.
+    if MIGRATE_ON_STARTUP:
+        migrate(engine)
+    schema = check_schema_version(engine)
+    activate_fulltext(engine.dialect.name, schema.get("fulltext"))
+    # Tokens revocados y aún vigentes (otra consulta); después se comprueban solo en memoria.
+    load_denylist(engine)
+
+    # Mide las consultas SQL de cada petición (cabecera Server-Timing y log de consultas lentas).
+    app.add_middleware(SQLTimingMiddleware)
+    # Limita las peticiones en curso por ruta y responde 503 + Retry-After cuando se satura.
+    # Se añade después: es el más externo, así una petición rechazada no llega a nada más.
+    app.add_middleware(AdmissionControlMiddleware,
+                       routes=route_table([(post_router, ""), (tag_router, ""), (auth_router, "/api/v1")]))
 
     # Registra las rutas definidas en el router de posts
     app.include_router(post_router)
+    # Catálogo de tags
+    app.include_router(tag_router)
     # Registra las rutas definidas en el router de autenticación
     # Si auth_router no está definido, comenta la siguiente línea:
     app.include_router(auth_router, prefix="/api/v1")
+    # Métricas internas (control de admisión)
+    app.include_router(monitoring_router, prefix="/api/v1")
 
     return app
 
@@ -0,0 +1,78 @@
+import argparse
+import getpass
+from sqlalchemy.orm import Session
+
+# Comandos de mantenimiento (se ejecutan aparte, no al arrancar la API).
+# Uso (desde first_steps/):
+#   python -m app.manage migrate
+#   python -m app.manage rebuild-counters
+#   python -m app.manage create-user alumno@example.com alumno
+
+
+# Aplica las migraciones pendientes del esquema (crea la BD si no existe).
+def migrate_command(args) -> None:
+    from app.core.db import engine
+    from app.core.migrations import SCHEMA_VERSION, migrate
+
+    applied = migrate(engine)
+    for description in applied:
+        print(f"Aplicada migración {description}")
+    print(f"Esquema en la versión {SCHEMA_VERSION}" + ("" if applied else " (sin cambios)"))
+
+
+# Recalcula desde cero el total de posts y el número de posts por tag.
+def rebuild_counters_command(args) -> None:
+    from app.core.db import engine
+    from app.api.v1.post.counters import rebuild_counters
+
+    with Session(engine) as db:
+        rows = rebuild_counters(db)
+        db.commit()
+    print(f"Contadores recalculados: {rows}")
+
+
+# Da de alta un usuario con la contraseña ya hasheada. Lo usan también las herramientas
+# que arrancan con una BD vacía (benchmarks, presupuesto de consultas).
+def create_user(engine, email: str, username: str, password: str, is_admin: bool = False) -> None:
+    from app.core.passwords import hash_password
+    from app.api.v1.auth.repository import UserRepository
+
+    with Session(engine) as db:
+        UserRepository(db).create(email, username, hash_password(password), is_admin)
+        db.commit()
+
+
+def create_user_command(args) -> None:
+    from sqlalchemy.exc import IntegrityError
+    from app.core.db import engine
+
+    password = args.password or getpass.getpass("Contraseña: ")
+    try:
+        create_user(engine, args.email, args.username, password, args.admin)
+    except IntegrityError:
+        raise SystemExit(f"Ya existe un usuario con el email {args.email}")
+    print(f"Usuario creado: {args.email}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description="Tareas de mantenimiento del blog")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("migrate", help="Aplica las migraciones pendientes del esquema").set_defaults(
+        handler=migrate_command)
+    commands.add_parser("rebuild-counters", help="Recalcula los contadores de posts y de tags").set_defaults(
+        handler=rebuild_counters_command)
+
+    create_user_parser = commands.add_parser("create-user", help="Crea un usuario que puede iniciar sesión")
+    create_user_parser.add_argument("email")
+    create_user_parser.add_argument("username")
+    create_user_parser.add_argument("--password", help="Si no se indica, se pide por teclado")
+    create_user_parser.add_argument("--admin", action="store_true", help="Puede revocar tokens de otros usuarios")
+    create_user_parser.set_defaults(handler=create_user_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 from .author import AuthorORM
+from .counter import CounterORM
 from .post import PostORM, post_tags
+from .revoked_token import RevokedTokenORM
 from .tag import TagORM
+from .user import UserORM
 
 __all__ = [
     "AuthorORM",
+    "CounterORM",
     "PostORM",
+    "RevokedTokenORM",
     "TagORM",
+    "UserORM",
     "post_tags"
 ] #se puede usar para que no importe todos los paquetes, solo se importa lo de la lista
\ No newline at end of file
@@ -0,0 +1,20 @@
+from __future__ import annotations
+from typing import Optional
+from sqlalchemy import Integer, String, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+# Contadores mantenidos por las escrituras, para no tener que hacer COUNT(*) en cada lectura.
+#  - name="posts": número total de posts.
+#  - name="tag:<id>": número de posts con ese tag (tag_id apunta al tag).
+# Se actualizan en la misma transacción que el INSERT/DELETE del post, así que siempre
+# coinciden con los datos confirmados. Se pueden recalcular con: python -m app.manage rebuild-counters
+class CounterORM(Base):
+    __tablename__ = "counters"
+    __table_args__ = (Index("ix_counters_value", "value"),)
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # ondelete="CASCADE": si se borra el tag, se borra su contador.
+    tag_id: Mapped[Optional[int]] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), unique=True, nullable=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,7 +1,8 @@
 from __future__ import annotations
+import secrets
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
-from sqlalchemy import Integer, String, Text, DateTime, UniqueConstraint, ForeignKey, Table, Column
+from sqlalchemy import Integer, String, Text, DateTime, UniqueConstraint, ForeignKey, Table, Column, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.db import Base
 
@@ -12,15 +13,23 @@ if TYPE_CHECKING:
 # Tabla de asociación para la relación Muchos a Muchos (Many-to-Many) entre Posts y Tags.
 # No es una clase ORM completa porque no tiene columnas extra, solo las claves foráneas.
 # ondelete="CASCADE": Si borras un post, se borra la relación en esta tabla (limpieza automática).
+# La clave primaria (post_id, tag_id) sirve para "tags de un post"; el índice (tag_id, post_id)
+# para "posts de un tag", ya ordenados por post_id (filtros por tags sin recorrer la tabla).
 post_tags = Table(
     "post_tags",
     Base.metadata,
     Column("post_id", ForeignKey(
         "posts.id", ondelete="CASCADE"), primary_key=True),
-    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
 )
 
 
+# Identificador aleatorio de cada post, fijado al crearlo.
+def new_post_uid() -> str:
+    return secrets.token_hex(8)
+
+
 # Definición de la tabla 'posts'
 class PostORM(Base):
     __tablename__ = "posts"
@@ -33,6 +42,12 @@ class PostORM(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow)
+    # Versión del post: cada modificación la incrementa. Es el ETag de GET /posts/{id} y lo que
+    # comprueba If-Match en PATCH, para que dos ediciones a la vez no se pisen sin avisar.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # Va en el ETag junto a la versión: la BD puede reutilizar el id de un post borrado y el post
+    # nuevo empieza otra vez en la versión 1; su uid distinto evita que los ETags coincidan.
+    uid: Mapped[str] = mapped_column(String(16), nullable=False, default=new_post_uid)
 
     # Clave foránea (Foreign Key) que apunta a la tabla 'authors'.
     author_id: Mapped[Optional[int]] = mapped_column(ForeignKey("authors.id"))
@@ -44,10 +59,17 @@ class PostORM(Base):
 
     # Relación Muchos a Muchos con Tags.
     # secondary=post_tags: Indica la tabla intermedia definida arriba.
-    # lazy="selectin": Optimización de carga. Carga los tags en una segunda consulta eficiente automáticamente.
+    # lazy="raise_on_sql": no se carga sola. Cada consulta elige qué cargar con un perfil
+    # de carga (list/detail/write en PostRepository); si algo intenta cargarla de forma
+    # perezosa (el típico N+1) se lanza un error en vez de lanzar consultas ocultas.
     tags: Mapped[List["TagORM"]] = relationship(
         secondary=post_tags,
         back_populates="posts",
-        lazy="selectin",
+        lazy="raise_on_sql",
         passive_deletes=True
-    )
\ No newline at end of file
+    )
+
+
+# Índice (lower(title), id): el listado ordenado por título pagina por keyset sobre esa misma
+# expresión. Sin él, cada página recorre y ordena la tabla entera.
+Index("ix_posts_title_lower_id", func.lower(PostORM.title), PostORM.id)
@@ -0,0 +1,16 @@
+from __future__ import annotations
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+# Tokens revocados antes de caducar (logout o revocación de un administrador).
+# Solo hace falta guardarlos hasta su 'exp': después el token ya no es válido de todas formas
+# y la fila se borra (ver app/core/revocation.py).
+class RevokedTokenORM(Base):
+    __tablename__ = "revoked_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    jti: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    # Caducidad del token revocado, en segundos desde epoch (el mismo valor que el claim 'exp').
+    expires_at: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
@@ -9,6 +9,17 @@ if TYPE_CHECKING:
     from .post import PostORM
 
 
+# Clave normalizada de un tag: sin espacios sobrantes y en minúsculas "Unicode" (casefold),
+# así "Python", " python " y "PYTHON" son el mismo tag y se busca con igualdad exacta (usa el índice).
+def normalize_tag_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+# Valor por defecto de name_key calculado a partir de 'name' en cada INSERT (también en bloque).
+def _default_name_key(context) -> str:
+    return normalize_tag_name(context.get_current_parameters()["name"])
+
+
 # Modelo ORM para la tabla de Etiquetas (Tags).
 class TagORM(Base):
     __tablename__ = "tags"
@@ -18,13 +29,18 @@ class TagORM(Base):
     # unique=True: Evita duplicados como "Python" y "Python" en la tabla de tags.
     name: Mapped[str] = mapped_column(String(30), unique=True, index=True)
 
+    # Clave normalizada con índice único: todas las búsquedas de tags se hacen por aquí.
+    # Un ilike(name) o lower(name) no pueden usar el índice de 'name'.
+    # Más larga que 'name': casefold() puede alargar el texto ("ß" -> "ss"), hasta 3 caracteres por cada uno.
+    name_key: Mapped[str] = mapped_column(String(90), unique=True, index=True, default=_default_name_key)
+
     # Relación Muchos a Muchos (Many-to-Many) con Posts.
     # secondary="post_tags": Le dice a SQLAlchemy que use la tabla intermedia 'post_tags' 
     # para encontrar qué posts tienen esta etiqueta.
     posts: Mapped[List["PostORM"]] = relationship(
         secondary="post_tags",
         back_populates="tags",
-        # lazy="selectin": Estrategia de carga. Cuando pidas un Tag, SQLAlchemy hará 
-        # una segunda consulta rápida para traer todos sus posts automáticamente.
-        lazy="selectin"
+        # lazy="raise_on_sql": nunca se cargan automáticamente todos los posts de un tag
+        # (un tag popular puede tener miles). Si se necesitan, se piden de forma explícita.
+        lazy="raise_on_sql"
     )
\ No newline at end of file
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from sqlalchemy import Boolean, Integer, String, false
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.db import Base
+
+
+# Usuarios que pueden iniciar sesión. La contraseña nunca se guarda en claro:
+# password_hash lleva el algoritmo y sus parámetros (ver app/core/passwords.py).
+class UserORM(Base):
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # El email es el nombre de usuario del login (campo 'username' del formulario OAuth2).
+    email: Mapped[str] = mapped_column(String(100), unique=True, index=True, nullable=False)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Los administradores pueden revocar tokens de cualquier usuario (va como claim 'admin' en el token).
+    is_admin: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
@@ -0,0 +1,241 @@
+# Benchmark de carga y latencia de la API completa, en proceso (sin servidor ni red).
+#
+# Crea una BD temporal con --posts posts (y --tags tags), aplica las migraciones y lanza
+# peticiones contra app.main.app a través de ASGI (httpx.ASGITransport): pasan por el
+# middleware, la validación, las dependencias, el repositorio y la serialización reales.
+# Cada escenario hace --warmup peticiones sin medir y luego --requests con --concurrency a la vez:
+# throughput (peticiones/s) y latencia p50/p95/p99 en ms. El resultado se imprime en JSON.
+#
+# La caché de respuestas se desactiva por defecto (si no, los GET repetidos no tocarían la BD);
+# --response-cache la deja activa.
+#
+# Regresiones: --save-baseline guarda el resultado; --baseline lo compara con uno guardado y
+# termina con código 1 si algún escenario empeora más de --threshold (p95 o throughput).
+#
+# Uso (desde first_steps/):
+#   python -m benchmarks.api --posts 2000 --requests 300 --concurrency 20 --save-baseline bench.json
+#   python -m benchmarks.api --posts 2000 --requests 300 --concurrency 20 --baseline bench.json
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+WORDS = ["python", "fastapi", "sqlalchemy", "async", "rendimiento", "índices", "caché", "consultas",
+         "pydantic", "tutorial", "despliegue", "pruebas", "api", "blog", "datos", "servidor"]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(latencies, elapsed, errors):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+# Inserta el conjunto de datos con la ingesta masiva del repositorio (en lotes de 500).
+def seed(engine, posts: int, tags: int, rng: random.Random) -> None:
+    from sqlalchemy.orm import Session
+    from app.api.v1.post.repository import PostRepository
+
+    authors = [{"name": f"autor{i}", "email": f"autor{i}@example.com"} for i in range(20)]
+    items = [{
+        "title": f"Post {i} sobre {rng.choice(WORDS)}",
+        "content": " ".join(rng.choices(WORDS, k=40)),
+        "author": rng.choice(authors),
+        "tags": [f"tag{n}" for n in rng.sample(range(tags), k=min(3, tags))],
+    } for i in range(posts)]
+
+    with Session(engine) as db:
+        repository = PostRepository(db)
+        for start in range(0, len(items), 500):
+            repository.bulk_create(items[start:start + 500])
+            db.commit()
+
+
+# Escenarios: nombre -> función que recibe (cliente, n.º de petición) y hace una petición.
+def build_scenarios(args, auth_header: dict, rng: random.Random):
+    counter = itertools.count()
+    created_ids = []
+
+    def random_id():
+        return rng.randint(1, args.posts)
+
+    async def list_posts(client, _):
+        return await client.get("/posts", params={"per_page": 20, "page": rng.randint(1, 20)})
+
+    async def list_posts_title(client, _):
+        return await client.get("/posts", params={"per_page": 20, "order_by": "title", "direction": "desc",
+                                                  "page": rng.randint(1, 20)})
+
+    async def list_posts_search(client, _):
+        return await client.get("/posts", params={"search": rng.choice(WORDS), "order_by": "relevance",
+                                                  "per_page": 20})
+
+    async def by_tags(client, _):
+        picked = rng.sample(range(args.tags), k=2)
+        return await client.get("/posts/by-tags", params=[
+            ("tags", f"tag{picked[0]}"), ("tags", f"tag{picked[1]}"), ("match", rng.choice(["any", "all"]))])
+
+    async def get_post(client, _):
+        return await client.get(f"/posts/{random_id()}")
+
+    async def create_post(client, _):
+        response = await client.post("/posts", headers=auth_header, json={
+            "title": f"Benchmark {next(counter)}",
+            "content": " ".join(rng.choices(WORDS, k=30)),
+            "tags": [{"name": f"tag{rng.randrange(args.tags)}"}],
+        })
+        if response.status_code == 201:
+            created_ids.append(response.json()["id"])
+        return response
+
+    async def update_post(client, _):
+        return await client.put(f"/posts/{random_id()}", headers=auth_header,
+                                json={"title": f"Editado {next(counter)}"})
+
+    # Borra los posts creados por create_post (se ejecuta después), sin tocar el dataset inicial.
+    async def delete_post(client, _):
+        post_id = created_ids.pop() if created_ids else random_id()
+        return await client.delete(f"/posts/{post_id}", headers=auth_header)
+
+    async def login(client, _):
+        return await client.post("/api/v1/auth/login",
+                                 data={"username": "alumno@example.com", "password": "password123"})
+
+    async def me(client, _):
+        return await client.get("/api/v1/auth/me", headers=auth_header)
+
+    return {
+        "list_posts": list_posts,
+        "list_posts_title_desc": list_posts_title,
+        "list_posts_search": list_posts_search,
+        "by_tags": by_tags,
+        "get_post": get_post,
+        "create_post": create_post,
+        "update_post": update_post,
+        "delete_post": delete_post,
+        "auth_login": login,
+        "auth_me": me,
+    }
+
+
+async def run_scenario(client, request, total: int, concurrency: int, warmup: int) -> dict:
+    # Calentamiento sin medir (primeras compilaciones de consultas, conexiones del pool...).
+    for number in range(warmup):
+        await request(client, number)
+
+    latencies = []
+    errors = 0
+    numbers = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for number in numbers:
+            start = time.perf_counter()
+            response = await request(client, number)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return _summary(latencies, time.perf_counter() - started, errors)
+
+
+# Compara con la línea base: empeora si el p95 sube o el throughput baja más del umbral.
+def regressions(results: dict, baseline: dict, threshold: float) -> list:
+    found = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            found.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            found.append(f"{name}: throughput {previous['rps']} -> {current['rps']} peticiones/s")
+    return found
+
+
+async def main(args):
+    # La configuración se lee al importar la app: las variables van antes de importarla.
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_api.db")
+    if not args.response_cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    import httpx
+    from app.core.db import engine
+    from app.core.migrations import migrate
+    from app.manage import create_user
+
+    migrate(engine)
+    create_user(engine, "alumno@example.com", "alumno", "password123")
+    rng = random.Random(args.seed)
+    seed(engine, args.posts, args.tags, rng)
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", data={
+            "username": "alumno@example.com", "password": "password123"})).json()["access_token"]
+        scenarios = build_scenarios(args, {"Authorization": f"Bearer {token}"}, rng)
+
+        # Siempre en el orden de build_scenarios: delete_post borra lo que creó create_post.
+        selected = [name for name in scenarios if not args.only or name in args.only]
+        unknown = set(args.only or ()) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+        results = {
+            "config": {"posts": args.posts, "tags": args.tags, "requests": args.requests,
+                       "concurrency": args.concurrency, "response_cache": args.response_cache},
+            "scenarios": {},
+        }
+        for name in selected:
+            results["scenarios"][name] = await run_scenario(
+                client, scenarios[name], args.requests, args.concurrency, args.warmup)
+
+    json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            found = regressions(results, json.load(file), args.threshold)
+        if found:
+            print("Regresiones respecto a la línea base:\n  " + "\n  ".join(found), file=sys.stderr)
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput y latencia de los endpoints de la API (en proceso)")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10, help="Peticiones sin medir antes de cada escenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", help="Escenarios a ejecutar (por defecto, todos)")
+    parser.add_argument("--response-cache", action="store_true", help="No desactivar la caché de respuestas")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--save-baseline", help="Guarda el resultado como línea base en este fichero")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Empeoramiento máximo permitido (0.2 = 20%%)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+# Benchmark: ruta síncrona (threadpool) vs ruta asíncrona (AsyncSession) del repositorio de posts.
+#
+# Simula la latencia de red de una BD remota (--latency-ms) antes de cada consulta y lanza
+# N peticiones concurrentes por cada nivel de concurrencia:
+#  - sync: PostRepository en anyio.to_thread (como un endpoint 'def' de FastAPI), limitado
+#    por los hilos del threadpool (40 por defecto en anyio).
+#  - async: AsyncPostRepository en el event loop (como un endpoint 'async def').
+# Con latencia de red, el throughput síncrono se estanca en ~hilos/latencia; el asíncrono
+# sigue creciendo hasta el tamaño del pool de conexiones.
+#
+# Uso (desde first_steps/):
+#   python -m benchmarks.async_db --posts 500 --latency-ms 20 --concurrency 10 40 100 200
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(mode, concurrency, latencies, elapsed):
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def main(args):
+    import anyio.to_thread
+    from app.core.db import Base
+    from app.models import PostORM
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.api.v1.post.repository import PostRepository
+    from app.api.v1.post.async_repository import AsyncPostRepository
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=args.pool_size, max_overflow=0)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}",
+                                       pool_size=args.pool_size, max_overflow=0)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    Base.metadata.create_all(bind=engine)
+    with SyncSession() as db:
+        db.add_all(PostORM(title=f"Post {i}", content="contenido " * 20) for i in range(args.posts))
+        db.commit()
+
+    latency = args.latency_ms / 1000
+
+    def sync_request():
+        start = time.perf_counter()
+        time.sleep(latency)  # latencia de red simulada: el hilo queda bloqueado
+        with SyncSession() as db:
+            PostRepository(db).search(None, "id", "asc", 1, 10)
+        return time.perf_counter() - start
+
+    async def async_request():
+        start = time.perf_counter()
+        await asyncio.sleep(latency)  # el event loop atiende a otros mientras tanto
+        async with AsyncSessionFactory() as db:
+            await AsyncPostRepository(db).search(None, "id", "asc", 1, 10)
+        return time.perf_counter() - start
+
+    async def run(mode, concurrency):
+        async def one():
+            if mode == "sync":
+                return await anyio.to_thread.run_sync(sync_request)
+            return await async_request()
+
+        started = time.perf_counter()
+        latencies = []
+        for _ in range(args.rounds):
+            latencies += await asyncio.gather(*[one() for _ in range(concurrency)])
+        return _summary(mode, concurrency, latencies, time.perf_counter() - started)
+
+    results = []
+    for concurrency in args.concurrency:
+        for mode in ("sync", "async"):
+            results.append(await run(mode, concurrency))
+
+    await async_engine.dispose()
+    engine.dispose()
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara la concurrencia de la ruta sync y async")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 40, 100, 200])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,47 @@
+# Microbenchmark: coste de autenticación por petición con y sin la caché de tokens verificados.
+#
+# Mide get_current_user (la dependencia de los endpoints protegidos) llamándola N veces con
+# el mismo token, primero con la caché desactivada (decode + HMAC + JSON cada vez) y luego
+# con la caché caliente (solo sha256 + búsqueda en el dict).
+#
+# Uso (desde first_steps/):
+#   python -m benchmarks.auth_cache --iterations 50000
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+
+async def _measure(get_current_user, token, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await get_current_user(token)
+    return (time.perf_counter() - start) / iterations
+
+
+async def main(args):
+    from app.core import security
+
+    token = security.create_access_token({"sub": "alumno@example.com", "username": "alumno"})
+
+    security.token_cache.maxsize = 0
+    uncached = await _measure(security.get_current_user, token, args.iterations)
+
+    security.token_cache.maxsize = security.TOKEN_CACHE_SIZE or 1024
+    await security.get_current_user(token)  # calienta la caché
+    cached = await _measure(security.get_current_user, token, args.iterations)
+
+    json.dump({
+        "iterations": args.iterations,
+        "uncached_us": round(uncached * 1e6, 2),
+        "cached_us": round(cached * 1e6, 2),
+        "speedup": round(uncached / cached, 1),
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coste de get_current_user con y sin caché")
+    parser.add_argument("--iterations", type=int, default=50000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+# Benchmark: escrituras por segundo con y sin group commit (app/core/group_commit.py).
+#
+# Lanza --requests creaciones de posts (y después otras tantas ediciones y borrados) con
+# --concurrency peticiones a la vez contra app.main.app (en proceso, httpx.ASGITransport),
+# primero con un commit por petición y después con el coalescedor activado, sobre la misma BD.
+# El resultado (peticiones/s y latencias por modo y operación) se imprime en JSON.
+#
+# Uso (desde first_steps/):
+#   python -m benchmarks.group_commit --requests 500 --concurrency 50
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+
+
+async def main(args):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_group_commit.db")
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    # El control de admisión limita las escrituras concurrentes: aquí se mide la BD, no el límite.
+    os.environ["ADMISSION_CONTROL"] = "false"
+
+    import httpx
+    from app.core.db import engine
+    from app.core.migrations import migrate
+    from app.manage import create_user
+    from benchmarks.api import run_scenario
+
+    migrate(engine)
+    create_user(engine, "alumno@example.com", "alumno", "password123")
+
+    from app.main import app
+    from app.core.group_commit import write_coalescer
+
+    rng = random.Random(args.seed)
+    counter = itertools.count()
+    results = {"config": {"requests": args.requests, "concurrency": args.concurrency,
+                          "window_ms": write_coalescer.window * 1000, "max_batch": write_coalescer.max_batch}}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/v1/auth/login", data={
+            "username": "alumno@example.com", "password": "password123"})).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        for mode, enabled in (("per_request_commit", False), ("group_commit", True)):
+            write_coalescer.enabled = enabled
+            created = []
+
+            async def create(client, _):
+                response = await client.post("/posts", headers=auth, json={
+                    "title": f"Benchmark {next(counter)}",
+                    "content": "Contenido del post de benchmark",
+                    "tags": [{"name": f"tag{rng.randrange(20)}"}],
+                })
+                if response.status_code == 201:
+                    created.append(response.json()["id"])
+                return response
+
+            async def update(client, number):
+                return await client.put(f"/posts/{created[number % len(created)]}", headers=auth,
+                                        json={"title": f"Editado {next(counter)}"})
+
+            async def delete(client, _):
+                return await client.delete(f"/posts/{created.pop()}", headers=auth)
+
+            results[mode] = {}
+            for name, request in (("create", create), ("update", update), ("delete", delete)):
+                results[mode][name] = await run_scenario(
+                    client, request, args.requests, args.concurrency, warmup=0)
+
+    results["speedup"] = {
+        name: round(results["group_commit"][name]["rps"] / results["per_request_commit"][name]["rps"], 2)
+        for name in ("create", "update", "delete")
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escrituras por segundo: commit por petición vs group commit")
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por operación y modo")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+# Benchmark: construcción de una página de GET /posts (PaginatedPost, per_page=50).
+#
+# Compara las dos formas de generar el cuerpo de la respuesta a partir de la BD:
+#  - orm: objetos PostORM con tags y autor cargados (perfil "list") y validación de cada
+#    item con PaginatedPost/PostPublic/Author (EmailStr) desde atributos + model_dump_json.
+#  - rows: columnas sueltas del repositorio (PostRepository.search) y dicts serializados
+#    con orjson (paginated_body), sin volver a validar datos que salen de nuestra propia BD.
+# Ambas hacen las mismas consultas (página con autor en JOIN + tags de la página).
+#
+# Uso (desde first_steps/):
+#   python -m benchmarks.list_serialization --posts 500 --iterations 300
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def _measure(build, iterations):
+    build()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    elapsed = time.perf_counter() - start
+    return {"rps": round(iterations / elapsed, 1), "ms_per_page": round(elapsed / iterations * 1000, 3)}
+
+
+def main(args):
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+    from app.core.db import Base
+    from app.models import PostORM, AuthorORM, TagORM
+    from app.api.v1.post.repository import PostRepository, loader_options
+    from app.api.v1.post.router import paginated_body
+    from app.api.v1.post.schemas import PaginatedPost
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    Base.metadata.create_all(bind=engine)
+    with Session() as db:
+        author = AuthorORM(name="alumno", email="alumno@example.com")
+        tags = [TagORM(name=f"tag{i}") for i in range(10)]
+        db.add_all(PostORM(title=f"Post {i}", content="contenido " * 20, author=author,
+                           tags=[tags[i % 10], tags[(i + 3) % 10]])
+                   for i in range(args.posts))
+        db.commit()
+
+    per_page = args.per_page
+    page_fields = dict(page=1, per_page=per_page, total=args.posts, total_pages=-(-args.posts // per_page),
+                       has_prev=False, has_next=args.posts > per_page, order_by="id", direction="asc")
+
+    def orm_page():
+        with Session() as db:
+            items = db.execute(
+                select(PostORM).options(*loader_options("list")).order_by(PostORM.id).limit(per_page)
+            ).scalars().all()
+            return PaginatedPost(**page_fields, items=items).model_dump_json().encode()
+
+    def rows_page():
+        with Session() as db:
+            _, items, _, _ = PostRepository(db).search(None, "id", "asc", 1, per_page, count="none")
+            return paginated_body(items, **page_fields)
+
+    # Mismo contenido en ambos caminos (el orden de las claves puede variar).
+    assert json.loads(orm_page()) == json.loads(rows_page())
+
+    orm = _measure(orm_page, args.iterations)
+    rows = _measure(rows_page, args.iterations)
+    engine.dispose()
+
+    json.dump({
+        "per_page": per_page,
+        "iterations": args.iterations,
+        "orm": orm,
+        "rows": rows,
+        "speedup": round(rows["rps"] / orm["rps"], 2),
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coste de generar una página de posts: ORM + Pydantic vs filas + orjson")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=300)
+    main(parser.parse_args())
@@ -0,0 +1,32 @@
+import os
+import tempfile
+import pytest
+
+# Los tests usan siempre una BD temporal propia (nunca la de DATABASE_URL del entorno).
+# Tiene que fijarse antes de importar app.core.db, que crea los engines al importarse.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+TEST_EMAIL = "pytest@example.com"
+TEST_PASSWORD = "contraseña-de-pytest"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.core.db import engine
+    from app.core.migrations import migrate
+    from app.manage import create_user
+
+    migrate(engine)
+    create_user(engine, TEST_EMAIL, "pytest", TEST_PASSWORD)
+
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+# Cabecera Authorization del usuario de prueba (un solo login por sesión: scrypt es caro).
+@pytest.fixture(scope="session")
+def auth(client):
+    response = client.post("/api/v1/auth/login", data={"username": TEST_EMAIL, "password": TEST_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,29 @@
+from typing import Sequence
+
+
+def create_post(client, auth, title: str, tags: Sequence[str] = (), content: str = "Contenido suficientemente largo") -> int:
+    response = client.post("/posts", headers=auth, json={
+        "title": title, "content": content, "tags": [{"name": name} for name in tags]})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+# Contadores (tabla 'counters') que no coinciden con un COUNT(*) hecho ahora: {nombre: (contador, real)}.
+# Un tag sin fila de contador cuenta como 0.
+def counter_mismatches() -> dict:
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+    from app.api.v1.post.counters import TOTAL_POSTS, tag_counter_name
+    from app.core.db import engine
+    from app.models import CounterORM, PostORM, TagORM, post_tags
+
+    with Session(engine) as db:
+        stored = dict(db.execute(select(CounterORM.name, CounterORM.value)).all())
+        actual = {TOTAL_POSTS: db.scalar(select(func.count()).select_from(PostORM))}
+        per_tag = (
+            select(TagORM.id, func.count(post_tags.c.post_id))
+            .outerjoin(post_tags, post_tags.c.tag_id == TagORM.id)
+            .group_by(TagORM.id)
+        )
+        actual.update({tag_counter_name(tag_id): count for tag_id, count in db.execute(per_tag).all()})
+    return {name: (stored.get(name, 0), count) for name, count in actual.items() if stored.get(name, 0) != count}
@@ -0,0 +1,58 @@
+import asyncio
+import re
+import httpx
+import pytest
+from app.core import admission
+from app.core.admission import AdmissionControlMiddleware
+
+
+# App ASGI mínima: cada petición espera hasta que el test la deja terminar.
+def _slow_app(release: asyncio.Event):
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+    return app
+
+
+@pytest.fixture
+def limited_route(monkeypatch):
+    monkeypatch.setitem(admission.ROUTE_LIMITS, "GET /lento", (1, 1))
+    monkeypatch.setattr(admission, "_limiters", {})
+    return [(re.compile("^/lento$"), "GET", "GET /lento")]
+
+
+def test_full_queue_returns_503_with_retry_after(limited_route):
+    async def scenario():
+        release = asyncio.Event()
+        app = AdmissionControlMiddleware(_slow_app(release), routes=limited_route, queue_timeout_ms=5000)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            first = asyncio.create_task(http.get("/lento"))    # en curso
+            second = asyncio.create_task(http.get("/lento"))   # en la cola
+            await asyncio.sleep(0.05)
+            rejected = await http.get("/lento")                 # cola llena
+            release.set()
+            return rejected, await first, await second
+
+    rejected, first, second = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == str(admission.ADMISSION_RETRY_AFTER_SECONDS)
+    assert (first.status_code, second.status_code) == (200, 200)
+    stats = admission.admission_stats()["GET /lento"]
+    assert (stats["admitted"], stats["rejected_queue_full"], stats["active"]) == (2, 1, 0)
+
+
+def test_queue_timeout_returns_503(limited_route):
+    async def scenario():
+        release = asyncio.Event()
+        app = AdmissionControlMiddleware(_slow_app(release), routes=limited_route, queue_timeout_ms=20)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            first = asyncio.create_task(http.get("/lento"))
+            await asyncio.sleep(0.01)
+            timed_out = await http.get("/lento")
+            release.set()
+            return timed_out, await first
+
+    timed_out, first = asyncio.run(scenario())
+    assert timed_out.status_code == 503 and first.status_code == 200
+    assert admission.admission_stats()["GET /lento"]["rejected_timeout"] == 1
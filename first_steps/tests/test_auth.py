@@ -0,0 +1,54 @@
+import os
+import tempfile
+import pytest
+from sqlalchemy import create_engine, text
+from app.core import migrations
+from tests.conftest import TEST_EMAIL, TEST_PASSWORD
+
+
+@pytest.fixture
+def fresh_engine():
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "migrations.db"))
+    yield engine
+    engine.dispose()
+
+
+def _emails(engine):
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT email FROM users"))}
+
+
+# Una instalación nueva no trae ninguna cuenta (y menos con contraseña conocida).
+def test_fresh_install_has_no_users(fresh_engine):
+    migrations.migrate(fresh_engine)
+    assert _emails(fresh_engine) == set()
+
+
+# Una BD de antes de la tabla de usuarios (versión 5, con datos) recibe las cuentas de antes.
+def test_pre_users_install_gets_legacy_accounts(fresh_engine, monkeypatch):
+    from app.core.passwords import verify_password
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:5])
+    migrations.migrate(fresh_engine)
+    with fresh_engine.begin() as conn:
+        conn.execute(text("INSERT INTO authors (name, email) VALUES ('alumno', 'alumno@example.com')"))
+    monkeypatch.undo()
+
+    migrations.migrate(fresh_engine)
+    assert _emails(fresh_engine) == {email for email, _, _ in migrations.LEGACY_USERS}
+    with fresh_engine.connect() as conn:
+        stored = conn.execute(text("SELECT password_hash FROM users LIMIT 1")).scalar_one()
+    assert verify_password("password123", stored)
+
+
+# El usuario de los tests lo crea conftest; las cuentas heredadas no existen en una BD nueva.
+def test_login(client):
+    from app.core import passwords
+
+    assert passwords._dummy_hash is not None  # calculado en el lifespan, antes del primer login
+    response = client.post("/api/v1/auth/login", data={"username": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert response.status_code == 200 and response.json()["access_token"]
+    assert client.post("/api/v1/auth/login", data={
+        "username": TEST_EMAIL, "password": "otra-contraseña"}).status_code == 401
+    assert client.post("/api/v1/auth/login", data={
+        "username": "alumno@example.com", "password": "password123"}).status_code == 401
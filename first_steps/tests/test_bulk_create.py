@@ -0,0 +1,62 @@
+import json
+from tests.helpers import counter_mismatches
+
+
+def _ndjson(items) -> bytes:
+    return b"\n".join(item if isinstance(item, bytes) else json.dumps(item).encode() for item in items)
+
+
+def _post_bulk(client, auth, body: bytes, chunk_size: int = 500):
+    response = client.post("/posts/bulk", params={"chunk_size": chunk_size}, content=body,
+                           headers={**auth, "content-type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_report_counts_created_conflict_and_invalid(client, auth):
+    report = _post_bulk(client, auth, _ndjson([
+        {"title": "Bulk informe 1", "content": "Contenido suficientemente largo", "tags": [{"name": "bulk"}]},
+        {"title": "Bulk informe 2", "content": "Contenido suficientemente largo"},
+        {"title": "Bulk informe 1", "content": "Mismo título dentro del lote"},   # duplicado en el lote
+        {"title": "x", "content": "Título demasiado corto"},                       # no valida
+        b"{esto no es json",                                                       # línea inválida
+    ]))
+    assert (report["created"], report["conflicts"], report["invalid"], report["errors"]) == (2, 1, 2, 0)
+    assert [item["status"] for item in report["items"]] == ["created", "created", "conflict", "invalid", "invalid"]
+    assert [item["index"] for item in report["items"]] == [0, 1, 2, 3, 4]
+
+    # Un título que ya existe en la BD también es un conflicto.
+    again = _post_bulk(client, auth, _ndjson([{"title": "Bulk informe 2", "content": "Contenido suficientemente largo"}]))
+    assert again["conflicts"] == 1 and again["created"] == 0
+    assert counter_mismatches() == {}
+
+
+def test_body_spanning_several_chunks(client, auth):
+    items = [{"title": f"Bulk en bloques {i}", "content": "Contenido suficientemente largo",
+              "tags": [{"name": "bloques"}, {"name": f"bloque{i % 3}"}]} for i in range(11)]
+    items.insert(6, {"title": "Bulk en bloques 2", "content": "Repetido en otro bloque"})
+    report = _post_bulk(client, auth, _ndjson(items), chunk_size=4)
+
+    assert report["created"] == 11 and report["conflicts"] == 1
+    assert report["items"][6]["status"] == "conflict"
+    assert len({item["id"] for item in report["items"] if item["status"] == "created"}) == 11
+
+    tags = {tag["name"]: tag["posts"] for tag in client.get("/tags", params={"prefix": "bloque", "per_page": 50}).json()["items"]}
+    assert tags == {"bloques": 11, "bloque0": 4, "bloque1": 4, "bloque2": 3}
+    assert counter_mismatches() == {}
+
+
+def test_json_array_body(client, auth):
+    response = client.post("/posts/bulk", headers=auth, json=[
+        {"title": "Bulk array 1", "content": "Contenido suficientemente largo"}])
+    assert response.json()["created"] == 1
+    assert client.post("/posts/bulk", headers=auth, json={"title": "no es un array"}).status_code == 400
+
+
+# El autor es siempre el usuario autenticado, como en POST /posts.
+def test_author_in_payload_is_ignored(client, auth):
+    me = client.get("/api/v1/auth/me", headers=auth).json()
+    report = _post_bulk(client, auth, _ndjson([{"title": "Bulk con autor ajeno", "content": "Contenido suficientemente largo",
+                                                "author": {"name": "otro", "email": "otro@example.com"}}]))
+    post = client.get(f"/posts/{report['items'][0]['id']}").json()
+    assert post["author"] == {"name": me["username"], "email": me["email"]}
@@ -0,0 +1,55 @@
+import pytest
+from tests.helpers import create_post
+
+
+# 5 posts con "bt-a", 3 de ellos también con "bt-b", y uno solo con "bt-b".
+@pytest.fixture(scope="module")
+def tagged(client, auth):
+    both = [create_post(client, auth, f"By tags ambos {i}", ["bt-a", "bt-b"]) for i in range(3)]
+    only_a = [create_post(client, auth, f"By tags solo a {i}", ["bt-a"]) for i in range(2)]
+    only_b = [create_post(client, auth, "By tags solo b", ["bt-b"])]
+    return {"both": both, "only_a": only_a, "only_b": only_b}
+
+
+def _walk(client, params, per_page=2) -> list:
+    body = client.get("/posts/by-tags", params=params + [("per_page", per_page)]).json()
+    ids = [item["id"] for item in body["items"]]
+    while body["next_cursor"]:
+        body = client.get("/posts/by-tags", params=params + [("per_page", per_page), ("cursor", body["next_cursor"])]).json()
+        ids += [item["id"] for item in body["items"]]
+    return ids
+
+
+def test_match_any(client, tagged):
+    ids = _walk(client, [("tags", "bt-a"), ("tags", "bt-b")])
+    assert ids == sorted(tagged["both"] + tagged["only_a"] + tagged["only_b"])
+
+
+def test_match_all(client, tagged):
+    assert _walk(client, [("tags", "bt-a"), ("tags", "bt-b"), ("match", "all")]) == tagged["both"]
+    # Un tag que no existe: ningún post los tiene todos.
+    assert _walk(client, [("tags", "bt-a"), ("tags", "no-existe"), ("match", "all")]) == []
+
+
+# Los tags se comparan normalizados (espacios y mayúsculas), y repetirlos no cambia nada.
+def test_tags_are_normalized(client, tagged):
+    params = [("tags", " BT-A "), ("tags", "bt-B"), ("tags", "bt-b"), ("match", "all")]
+    assert _walk(client, params) == tagged["both"]
+
+
+def test_items_have_their_tags(client, tagged):
+    items = client.get("/posts/by-tags", params=[("tags", "bt-b"), ("per_page", 10)]).json()["items"]
+    tags = {item["id"]: sorted(tag["name"] for tag in item["tags"]) for item in items}
+    assert tags[tagged["both"][0]] == ["bt-a", "bt-b"]
+    assert tags[tagged["only_b"][0]] == ["bt-b"]
+
+
+def test_per_page_is_capped(client, tagged, monkeypatch):
+    import app.api.v1.post.router as post_router
+    monkeypatch.setattr(post_router, "BY_TAGS_MAX_PER_PAGE", 2)
+    body = client.get("/posts/by-tags", params=[("tags", "bt-a"), ("per_page", 1000)]).json()
+    assert body["per_page"] == 2 and len(body["items"]) == 2 and body["has_next"]
+
+
+def test_bad_cursor_is_a_400(client):
+    assert client.get("/posts/by-tags", params={"tags": "bt-a", "cursor": "roto"}).status_code == 400
@@ -0,0 +1,63 @@
+import json
+import sys
+import pytest
+from sqlalchemy import update
+from tests.helpers import counter_mismatches, create_post
+
+
+# Todas las escrituras de posts, con y sin group commit: los contadores tienen que
+# coincidir siempre con un COUNT(*) hecho después.
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_every_write_path_keeps_counters_exact(client, auth, monkeypatch, group_commit):
+    from app.core.group_commit import write_coalescer
+    monkeypatch.setattr(write_coalescer, "enabled", group_commit)
+    prefix = f"Contador {group_commit}"
+
+    def check(step):
+        assert counter_mismatches() == {}, step
+
+    ids = [create_post(client, auth, f"{prefix} {i}", ["cuenta", f"cuenta{i % 2}"]) for i in range(6)]
+    check("create")
+
+    assert client.patch(f"/posts/{ids[0]}", headers=auth, json={
+        "add_tags": [{"name": "cuenta-nueva"}, {"name": "cuenta"}]}).status_code == 200
+    check("patch add")
+    assert client.patch(f"/posts/{ids[0]}", headers=auth, json={
+        "remove_tags": [{"name": "cuenta0"}, {"name": "no-existe"}]}).status_code == 200
+    check("patch remove")
+
+    assert client.put(f"/posts/{ids[1]}", headers=auth, json={"tags": [{"name": "cuenta-put"}]}).status_code == 200
+    check("put tags")
+
+    assert client.delete(f"/posts/{ids[2]}", headers=auth).status_code == 204
+    check("delete")
+    assert client.delete("/posts", headers=auth, params=[("ids", ids[3]), ("ids", ids[4]), ("ids", 999999)]).json()["deleted"] == 2
+    check("bulk delete ids")
+
+    create_post(client, auth, f"{prefix} por tag", [f"borrar-{group_commit}"])
+    assert client.delete("/posts", headers=auth, params={"tag": f"borrar-{group_commit}"}).json()["deleted"] == 1
+    check("bulk delete tag")
+
+    bulk = client.post("/posts/bulk", headers={**auth, "content-type": "application/x-ndjson"}, content=b"\n".join(
+        json.dumps({"title": f"{prefix} bulk {i}", "content": "Contenido suficientemente largo",
+                    "tags": [{"name": "cuenta"}, {"name": "cuenta-bulk"}]}).encode() for i in range(3)))
+    assert bulk.json()["created"] == 3
+    check("bulk create")
+
+
+def test_rebuild_counters_command_repairs_counters(client, auth, monkeypatch, capsys):
+    from sqlalchemy.orm import Session
+    from app.core.db import engine
+    from app.manage import main
+    from app.models import CounterORM
+
+    create_post(client, auth, "Contador a reparar", ["reparar"])
+    with Session(engine) as db:
+        db.execute(update(CounterORM).values(value=CounterORM.value + 7))
+        db.commit()
+    assert counter_mismatches() != {}
+
+    monkeypatch.setattr(sys, "argv", ["app.manage", "rebuild-counters"])
+    main()
+    assert "Contadores recalculados" in capsys.readouterr().out
+    assert counter_mismatches() == {}
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import pytest
+from tests.helpers import create_post
+
+
+@pytest.fixture(scope="module")
+def exported_posts(client, auth):
+    return {
+        create_post(client, auth, "Export con tags", ["export", "csv"], content="Línea con, coma y \"comillas\""): ["export", "csv"],
+        create_post(client, auth, "Export sin tags"): [],
+    }
+
+
+def _total(client) -> int:
+    return client.get("/posts", params={"per_page": 1}).json()["total"]
+
+
+def test_csv_header_and_rows(client, exported_posts):
+    response = client.get("/posts/export", params={"format": "csv", "batch_size": 3})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "title", "content", "created_at", "author_name", "author_email", "tags"]
+    assert len(rows) - 1 == _total(client)
+
+    by_id = {int(row[0]): row for row in rows[1:]}
+    me = client.get("/posts/{}".format(next(iter(exported_posts)))).json()
+    for post_id, tags in exported_posts.items():
+        row = by_id[post_id]
+        assert sorted(row[6].split("|") if row[6] else []) == sorted(tags)
+    first = by_id[next(iter(exported_posts))]
+    assert first[1:3] == ["Export con tags", me["content"]]
+    assert (first[4], first[5]) == (me["author"]["name"], me["author"]["email"])
+
+
+def test_ndjson_lines(client, exported_posts):
+    response = client.get("/posts/export", params={"batch_size": 2})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == _total(client)
+    assert len({record["id"] for record in records}) == len(records)
+
+    by_id = {record["id"]: record for record in records}
+    for post_id, tags in exported_posts.items():
+        record = by_id[post_id]
+        assert sorted(record["tags"]) == sorted(tags)
+        assert set(record) == {"id", "title", "content", "created_at", "author", "tags"}
+
+
+# El tamaño del lote no cambia el resultado.
+def test_batch_size_does_not_change_output(client, exported_posts):
+    small = client.get("/posts/export", params={"batch_size": 1}).text
+    large = client.get("/posts/export", params={"batch_size": 10000}).text
+    assert small == large
+
+
+@pytest.mark.parametrize("batch_size", [0, 10001])
+def test_batch_size_bounds(client, batch_size):
+    assert client.get("/posts/export", params={"batch_size": batch_size}).status_code == 422
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/posts/export", params={"format": "xml"}).status_code == 422
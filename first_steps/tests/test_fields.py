@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import event
+from app.core.cache import response_cache
+from tests.helpers import create_post
+
+
+@pytest.fixture(scope="module")
+def post_id(client, auth):
+    return create_post(client, auth, "Post con campos", ["campos"])
+
+
+@pytest.mark.parametrize("fields, keys", [
+    ("title", {"id", "title"}),
+    ("tags,author", {"id", "tags", "author"}),
+    ("id", {"id"}),
+    (" title , content ", {"id", "title", "content"}),
+])
+def test_detail_returns_only_requested_fields(client, post_id, fields, keys):
+    assert set(client.get(f"/posts/{post_id}", params={"fields": fields}).json()) == keys
+
+
+def test_list_and_by_tags_return_only_requested_fields(client, post_id):
+    items = client.get("/posts", params={"fields": "title,tags"}).json()["items"]
+    assert items and all(set(item) == {"id", "title", "tags"} for item in items)
+    items = client.get("/posts/by-tags", params={"tags": "campos", "fields": "author"}).json()["items"]
+    assert items and all(set(item) == {"id", "author"} for item in items)
+
+
+def test_unknown_field_is_a_400(client, post_id):
+    response = client.get(f"/posts/{post_id}", params={"fields": "title,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_include_content_false(client, post_id):
+    assert set(client.get(f"/posts/{post_id}", params={"include_content": "false"}).json()) == {"id", "title"}
+    # Con fields, include_content=false solo quita el contenido.
+    body = client.get(f"/posts/{post_id}", params={"include_content": "false", "fields": "content,tags"}).json()
+    assert set(body) == {"id", "tags"}
+
+
+# Las columnas no pedidas ni siquiera se leen de la BD.
+def test_unrequested_columns_are_not_selected(client, post_id):
+    from app.core.db import async_engine, async_read_engine
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engines = {async_engine.sync_engine, async_read_engine.sync_engine}
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        response_cache.backend.clear()
+        client.get(f"/posts/{post_id}", params={"fields": "title"})
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+    assert statements and not any("posts.content" in statement for statement in statements)
@@ -0,0 +1,38 @@
+import asyncio
+import re
+import httpx
+import pytest
+
+
+def _db_queries(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+@pytest.fixture
+def group_commit(monkeypatch):
+    from app.core.group_commit import write_coalescer
+    monkeypatch.setattr(write_coalescer, "enabled", True)
+
+
+# Cada escritura cuenta su propio SQL, aunque lo ejecute el worker del group commit
+# (antes todo se sumaba a la petición que arrancó el worker).
+def test_each_write_reports_its_own_queries(client, auth, group_commit):
+    for i in range(3):
+        response = client.post("/posts", headers=auth, json={
+            "title": f"Post en grupo {i}", "content": "Contenido suficientemente largo"})
+        assert response.status_code == 201, response.text
+        assert _db_queries(response) > 0
+
+
+def test_batched_writes_report_their_own_queries(client, auth, group_commit):
+    from app.main import app
+
+    async def create_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(http.post("/posts", headers=auth, json={
+                "title": f"Post en lote {i}", "content": "Contenido suficientemente largo"}) for i in range(8)))
+
+    responses = asyncio.run(create_all())
+    assert all(response.status_code == 201 for response in responses)
+    assert all(_db_queries(response) > 0 for response in responses)
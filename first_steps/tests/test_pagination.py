@@ -0,0 +1,67 @@
+import base64
+import json
+import pytest
+from tests.helpers import create_post
+
+
+# Títulos que solo se distinguen en mayúsculas: mismo lower(title), el id desempata.
+@pytest.fixture(scope="module")
+def keyset_posts(client, auth):
+    for title in ("Keyset Beta", "keyset beta", "KEYSET BETA", "Keyset alfa", "keyset Gamma", "Keyset delta"):
+        create_post(client, auth, title)
+
+
+def _walk_offset(client, **params) -> list:
+    ids, page = [], 1
+    while True:
+        body = client.get("/posts", params={**params, "page": page, "per_page": 4, "fields": "id,title"}).json()
+        ids += body["items"]
+        if not body["has_next"]:
+            return ids
+        page += 1
+
+
+def _walk_cursor(client, **params) -> list:
+    body = client.get("/posts", params={**params, "per_page": 4, "fields": "id,title"}).json()
+    items = body["items"]
+    while body["next_cursor"]:
+        body = client.get("/posts", params={
+            **params, "per_page": 4, "fields": "id,title", "cursor": body["next_cursor"]}).json()
+        items += body["items"]
+    return items
+
+
+@pytest.mark.parametrize("order_by", ["id", "title"])
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_cursor_walk_matches_offset_walk(client, keyset_posts, order_by, direction):
+    offset_items = _walk_offset(client, order_by=order_by, direction=direction)
+    cursor_items = _walk_cursor(client, order_by=order_by, direction=direction)
+    assert cursor_items == offset_items
+    assert len({item["id"] for item in cursor_items}) == len(cursor_items)
+
+
+def test_title_order_breaks_ties_by_id(client, keyset_posts):
+    items = _walk_cursor(client, order_by="title", direction="asc")
+    betas = [item["id"] for item in items if item["title"].lower() == "keyset beta"]
+    assert len(betas) == 3 and betas == sorted(betas)
+
+
+def _token(payload) -> str:
+    raw = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("order_by, cursor", [
+    ("id", "no-es-un-cursor"),
+    ("id", "%%%"),
+    ("id", _token(b"\xff\xfe")),
+    ("id", _token([1, 2])),
+    ("id", _token({"o": "id", "d": "asc"})),
+    ("id", _token({"o": "id", "d": "asc", "k": ["x"]})),
+    ("id", _token({"o": "id", "d": "asc", "k": [10 ** 30]})),
+    ("title", _token({"o": "title", "d": "asc", "k": [5, 1]})),
+    ("title", _token({"o": "title", "d": "desc", "k": ["a", 1]})),  # cursor de otro orden
+])
+def test_malformed_or_tampered_cursor_is_a_400(client, order_by, cursor):
+    response = client.get("/posts", params={"cursor": cursor, "order_by": order_by})
+    assert response.status_code == 400, response.text
@@ -0,0 +1,35 @@
+POST = {"title": "Post con ETag", "content": "Contenido suficientemente largo"}
+
+
+def _create(client, auth) -> int:
+    response = client.post("/posts", headers=auth, json=POST)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_patch_with_current_etag_applies_and_stale_one_is_rejected(client, auth):
+    post_id = _create(client, auth)
+    etag = client.get(f"/posts/{post_id}").headers["etag"]
+
+    response = client.patch(f"/posts/{post_id}", headers={**auth, "If-Match": etag}, json={"content": "Contenido nuevo y largo"})
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
+
+    stale = client.patch(f"/posts/{post_id}", headers={**auth, "If-Match": etag}, json={"content": "Otro contenido largo"})
+    assert stale.status_code == 412
+    client.delete(f"/posts/{post_id}", headers=auth)
+
+
+# SQLite reutiliza el id del último post borrado y el nuevo vuelve a la versión 1:
+# el ETag del post borrado no puede valer para el nuevo.
+def test_etag_of_deleted_post_does_not_match_post_reusing_its_id(client, auth):
+    post_id = _create(client, auth)
+    old_etag = client.get(f"/posts/{post_id}").headers["etag"]
+    client.delete(f"/posts/{post_id}", headers=auth)
+
+    new_id = _create(client, auth)
+    assert new_id == post_id  # el escenario que se quiere comprobar
+    assert client.get(f"/posts/{new_id}", headers={"If-None-Match": old_etag}).status_code == 200
+    response = client.patch(f"/posts/{new_id}", headers={**auth, "If-Match": old_etag}, json={"title": "Título pisado"})
+    assert response.status_code == 412
+    client.delete(f"/posts/{new_id}", headers=auth)
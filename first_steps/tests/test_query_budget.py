@@ -0,0 +1,166 @@
+from contextlib import contextmanager
+from typing import List, Sequence, Union
+import pytest
+from sqlalchemy import Engine, event
+
+# Presupuesto de consultas SQL por endpoint.
+# Un N+1 (una consulta extra por cada fila) no rompe nada funcionalmente, solo hace la
+# API más lenta a medida que crece la BD. Contando las sentencias de cada petición con
+# un conjunto de datos de varias filas, una regresión así se detecta como un fallo.
+
+# Máximo de sentencias SQL por petición (con la caché de respuestas vacía).
+QUERY_BUDGETS = {
+    "GET /posts": 3,                 # contador de posts + página (columnas, autor con JOIN) + tags
+    "GET /posts?cursor": 2,          # página + tags (sin COUNT)
+    "GET /posts?search": 3,
+    "GET /posts/by-tags": 2,         # posts + tags
+    "GET /posts/by-tags?match=all": 3,  # ids y contadores de los tags + posts + tags
+    "GET /posts/{id}": 2,            # post + tags
+    "POST /posts": 6,                # autor, tag nuevo (SELECT + INSERT), post, post_tags, contadores
+    "GET /tags": 1,                  # tags + contadores (JOIN)
+    "GET /tags?cursor": 1,
+    "PUT /posts/{id}": 3,            # post + tags + UPDATE
+    "PATCH /posts/{id}": 1,          # UPDATE ... RETURNING
+    "PATCH /posts/{id}?tags": 7,     # UPDATE, ids de tags (quitar/añadir), tag nuevo, DELETE e INSERT post_tags, contadores
+    "DELETE /posts/{id}": 3,         # DELETE post_tags + DELETE post (RETURNING) + contadores
+    "DELETE /posts?ids": 3,          # lo mismo para todo el bloque de ids
+    "DELETE /posts?tag": 5,          # id del tag, ids de sus posts, DELETE post_tags + posts, contadores
+}
+
+
+# Registra las sentencias SQL que ejecutan uno o varios engines mientras está activo.
+# Para el engine asíncrono se pasa async_engine.sync_engine (y el de escritura, si es otro).
+class QueryCounter:
+    def __init__(self, engines: Union[Engine, Sequence[Engine]]):
+        engines = [engines] if isinstance(engines, Engine) else engines
+        self.engines = list(dict.fromkeys(engines))
+        self.statements: List[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+        return False
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def assert_max_queries(engines: Union[Engine, Sequence[Engine]], limit: int, label: str = ""):
+    with QueryCounter(engines) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {sql.strip()}" for i, sql in enumerate(counter.statements))
+        raise AssertionError(
+            f"{label or 'Bloque'}: {counter.count} consultas SQL, máximo permitido {limit}\n{listing}")
+
+
+def _create_post(client, auth, title: str, tags: Sequence[str]) -> int:
+    response = client.post("/posts", headers=auth, json={
+        "title": title, "content": "Contenido suficientemente largo",
+        "tags": [{"name": name} for name in tags],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+# Varias filas con varios tags: un N+1 se notaría en el número de consultas.
+@pytest.fixture(scope="module")
+def seeded(client, auth):
+    for i in range(12):
+        _create_post(client, auth, f"Post de presupuesto {i}", ["python", f"tag{i % 4}"])
+
+
+# Cada caso prepara lo que necesita (fuera del recuento) y devuelve la petición que se mide.
+# Los que escriben crean sus propios posts: no dependen del orden ni de los demás casos.
+def _patch_tags(client, auth):
+    post_id = _create_post(client, auth, "Post para parchear tags", ["python", "tag3"])
+    return lambda: client.patch(f"/posts/{post_id}", headers=auth, json={
+        "add_tags": [{"name": "parche"}], "remove_tags": [{"name": "tag3"}]})
+
+
+def _patch(client, auth):
+    post_id = _create_post(client, auth, "Post para parchear", ["python"])
+    etag = client.get(f"/posts/{post_id}").headers["etag"]
+    return lambda: client.patch(f"/posts/{post_id}", headers={**auth, "If-Match": etag},
+                                json={"title": "Título parcheado"})
+
+
+def _put(client, auth):
+    post_id = _create_post(client, auth, "Post para cambiar", ["python", "tag1"])
+    return lambda: client.put(f"/posts/{post_id}", headers=auth, json={"title": "Título cambiado"})
+
+
+def _delete(client, auth):
+    post_id = _create_post(client, auth, "Post para borrar", ["python", "tag2"])
+    return lambda: client.delete(f"/posts/{post_id}", headers=auth)
+
+
+def _delete_ids(client, auth):
+    ids = [_create_post(client, auth, f"Post para borrar en bloque {i}", ["python", "tag2"]) for i in range(3)]
+    return lambda: client.delete("/posts", headers=auth, params=[("ids", post_id) for post_id in ids])
+
+
+def _delete_tag(client, auth):
+    for i in range(3):
+        _create_post(client, auth, f"Post para borrar por tag {i}", ["python", "borrar"])
+    return lambda: client.delete("/posts", headers=auth, params={"tag": "borrar"})
+
+
+def _posts_cursor(client, auth):
+    cursor = client.get("/posts", params={"per_page": 5}).json()["next_cursor"]
+    return lambda: client.get("/posts", params={"per_page": 5, "cursor": cursor})
+
+
+def _tags_cursor(client, auth):
+    cursor = client.get("/tags", params={"per_page": 2, "prefix": "TAG"}).json()["next_cursor"]
+    return lambda: client.get("/tags", params={"per_page": 2, "prefix": "TAG", "cursor": cursor})
+
+
+CASES = {
+    "GET /posts": lambda client, auth: lambda: client.get("/posts", params={"per_page": 10}),
+    "GET /posts?cursor": _posts_cursor,
+    "GET /posts?search": lambda client, auth: lambda: client.get("/posts", params={"search": "presupuesto"}),
+    "GET /posts/by-tags": lambda client, auth: lambda: client.get(
+        "/posts/by-tags", params=[("tags", "python"), ("tags", "tag1")]),
+    "GET /posts/by-tags?match=all": lambda client, auth: lambda: client.get(
+        "/posts/by-tags", params=[("tags", "python"), ("tags", "tag1"), ("match", "all")]),
+    "GET /posts/{id}": lambda client, auth: lambda: client.get("/posts/1"),
+    "POST /posts": lambda client, auth: lambda: client.post("/posts", headers=auth, json={
+        "title": "Post nuevo", "content": "Contenido suficientemente largo",
+        "tags": [{"name": "python"}, {"name": "nuevo"}]}),
+    "GET /tags": lambda client, auth: lambda: client.get("/tags", params={"per_page": 2}),
+    "GET /tags?cursor": _tags_cursor,
+    "PUT /posts/{id}": _put,
+    "PATCH /posts/{id}": _patch,
+    "PATCH /posts/{id}?tags": _patch_tags,
+    "DELETE /posts/{id}": _delete,
+    "DELETE /posts?ids": _delete_ids,
+    "DELETE /posts?tag": _delete_tag,
+}
+
+
+def test_every_budget_has_a_case():
+    assert set(CASES) == set(QUERY_BUDGETS)
+
+
+@pytest.mark.parametrize("label", list(QUERY_BUDGETS))
+def test_query_budget(label, client, auth, seeded):
+    from app.core.cache import response_cache
+    from app.core.db import async_engine, async_read_engine, async_write_engine
+
+    request = CASES[label](client, auth)
+    engines = [async_engine.sync_engine, async_write_engine.sync_engine, async_read_engine.sync_engine]
+    response_cache.backend.clear()
+    with assert_max_queries(engines, QUERY_BUDGETS[label], label):
+        response = request()
+    assert response.status_code < 400, response.text
@@ -0,0 +1,111 @@
+import pytest
+from app.core.cache import CacheBackend, CachedResponse, LRUCacheBackend, ResponseCache, response_cache
+from tests.helpers import create_post
+
+
+def _cached_keys():
+    return set(response_cache.backend._entries)
+
+
+def test_if_none_match_returns_304(client, auth):
+    post_id = create_post(client, auth, "Post para 304")
+    for path in (f"/posts/{post_id}", "/posts"):
+        first = client.get(path)
+        assert first.status_code == 200
+        again = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert again.headers["etag"] == first.headers["etag"]
+        assert client.get(path, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+
+def _titles(client) -> set:
+    body = client.get("/posts", params={"per_page": 50, "order_by": "id", "direction": "desc", "fields": "id,title"}).json()
+    return {item["title"] for item in body["items"]}
+
+
+# Tras cada escritura, el listado y el detalle (ya cacheados) se sirven con los datos nuevos.
+@pytest.mark.parametrize("write", ["post", "put", "patch", "delete"])
+def test_writes_invalidate_cached_list_and_detail(client, auth, write):
+    post_id = create_post(client, auth, f"Post cacheado {write}")
+    detail = f"/posts/{post_id}"
+    assert f"Post cacheado {write}" in _titles(client)
+    assert client.get(detail).status_code == 200
+
+    if write == "post":
+        create_post(client, auth, "Post cacheado nuevo")
+        assert "Post cacheado nuevo" in _titles(client)
+        return
+    if write == "put":
+        response = client.put(detail, headers=auth, json={"title": "Post cacheado put bis"})
+    elif write == "patch":
+        response = client.patch(detail, headers=auth, json={"title": "Post cacheado patch bis"})
+    else:
+        response = client.delete(detail, headers=auth)
+    assert response.status_code < 300, response.text
+
+    if write == "delete":
+        assert client.get(detail).status_code == 404
+        assert f"Post cacheado {write}" not in _titles(client)
+    else:
+        assert client.get(detail).json()["title"] == f"Post cacheado {write} bis"
+        assert f"Post cacheado {write} bis" in _titles(client)
+
+
+# Un valor con '&' o '=' codificados no comparte clave con varios parámetros.
+def test_encoded_separators_do_not_collide(client, auth):
+    for i in range(3):
+        create_post(client, auth, f"Post con dos tags {i}", ["clave1", "clave2"])
+    poisoned = client.get("/posts/by-tags?tags=clave1%26tags%3Dclave2")
+    assert poisoned.status_code == 200
+    real = client.get("/posts/by-tags", params=[("tags", "clave1"), ("tags", "clave2")])
+    assert len(real.json()["items"]) == 3
+
+
+# Una lectura que empezó antes de una escritura no guarda su resultado (podría ser antiguo).
+def test_generation_blocks_stale_fill():
+    cache = ResponseCache(LRUCacheBackend(8))
+    generation = cache.generation
+    cache.invalidate("posts")  # la escritura se confirma mientras la lectura está en curso
+    cache.store("/posts?", b"[]", ["posts"], generation)
+    assert cache.get("/posts?") is None
+
+    cache.store("/posts?", b"[]", ["posts"], cache.generation)
+    assert cache.get("/posts?") is not None
+
+
+def test_generation_blocks_stale_fill_in_endpoint(client, auth, monkeypatch):
+    from app.api.v1.post.async_repository import AsyncPostRepository
+
+    post_id = create_post(client, auth, "Post de carrera")
+    original_get = AsyncPostRepository.get
+
+    async def get_racing_a_write(self, *args, **kwargs):
+        post = await original_get(self, *args, **kwargs)
+        response_cache.invalidate(f"post:{post_id}")
+        return post
+
+    monkeypatch.setattr(AsyncPostRepository, "get", get_racing_a_write)
+    assert client.get(f"/posts/{post_id}").status_code == 200
+    assert not any(key.startswith(f"/posts/{post_id}?") for key in _cached_keys())
+
+
+def test_backend_missing_methods_fails_on_creation():
+    class Incomplete(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_entries_expire(monkeypatch):
+    import app.core.cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    backend = LRUCacheBackend(4, ttl=30)
+    backend.set("k", CachedResponse(b"x", '"e"'), ["t"])
+    assert backend.get("k") is not None
+    now[0] += 31
+    assert backend.get("k") is None
+    assert len(backend) == 0
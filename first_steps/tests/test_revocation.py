@@ -0,0 +1,35 @@
+import time
+from sqlalchemy import create_engine, delete, insert
+from app.core.revocation import TokenDenylist
+from app.models import RevokedTokenORM
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    RevokedTokenORM.__table__.create(engine)
+    return engine
+
+
+# Otro proceso tiene que ver una revocación aunque su fila reutilice el id de una ya podada.
+def test_load_sees_rows_that_reuse_pruned_ids():
+    engine = _engine()
+    now = int(time.time())
+    worker = TokenDenylist(100, 0.001)
+    with engine.begin() as conn:
+        conn.execute(insert(RevokedTokenORM), [{"jti": "a", "expires_at": now + 60},
+                                               {"jti": "b", "expires_at": now + 60}])
+        assert worker.load(conn) == 2
+        conn.execute(delete(RevokedTokenORM))
+        conn.execute(insert(RevokedTokenORM).values(id=1, jti="c", expires_at=now + 60))
+        assert worker.load(conn) == 1
+    assert worker.is_revoked("c")
+    assert worker.is_revoked("a")  # lo que ya estaba en memoria se mantiene hasta que caduca
+
+
+def test_expired_rows_are_not_loaded():
+    engine = _engine()
+    worker = TokenDenylist(100, 0.001)
+    with engine.begin() as conn:
+        conn.execute(insert(RevokedTokenORM).values(jti="viejo", expires_at=int(time.time()) - 1))
+        assert worker.load(conn) == 0
+    assert not worker.is_revoked("viejo")
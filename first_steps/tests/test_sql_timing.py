@@ -0,0 +1,31 @@
+import re
+from app.core.cache import response_cache
+from tests.helpers import create_post
+
+
+def _timing(response):
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', response.headers["server-timing"])
+    return float(match.group(1)), int(match.group(2))
+
+
+def _uncached_get(client, path):
+    response_cache.backend.clear()
+    return client.get(path)
+
+
+def test_server_timing_counts_the_request_queries(client, auth):
+    post_id = create_post(client, auth, "Post con Server-Timing", ["timing"])
+    duration, count = _timing(_uncached_get(client, f"/posts/{post_id}"))
+    assert count == 2  # post + tags
+    assert duration > 0
+
+
+# Cada petición cuenta solo lo suyo, también tras sentencias que fallan en la misma
+# conexión del pool (un título duplicado: IntegrityError -> 409).
+def test_stats_do_not_build_up_across_requests(client, auth):
+    post_id = create_post(client, auth, "Post repetido para timing")
+    for _ in range(3):
+        duplicate = client.post("/posts", headers=auth, json={
+            "title": "Post repetido para timing", "content": "Contenido suficientemente largo"})
+        assert duplicate.status_code == 409
+        assert _timing(_uncached_get(client, f"/posts/{post_id}"))[1] == 2
@@ -0,0 +1,64 @@
+import pytest
+from app.api.v1.post.pagination import encode_cursor
+from tests.helpers import create_post
+
+# Número de posts de cada tag del catálogo (todos distintos: el orden por count no tiene empates).
+COUNTS = {"tc-uno": 4, "tc-tres": 3, "tc-dos": 2, "TC-Mayus": 1}
+
+
+@pytest.fixture(scope="module")
+def catalogue(client, auth):
+    for name, count in COUNTS.items():
+        for i in range(count):
+            create_post(client, auth, f"Catálogo {name} {i}", [name])
+    # Un tag cuyo único post se borra se queda a 0 y no aparece.
+    post_id = create_post(client, auth, "Catálogo tag vacío", ["tc-vacio"])
+    assert client.delete(f"/posts/{post_id}", headers=auth).status_code == 204
+
+
+def _walk(client, params, per_page=1) -> list:
+    body = client.get("/tags", params={**params, "per_page": per_page}).json()
+    items = body["items"]
+    while body["next_cursor"]:
+        body = client.get("/tags", params={**params, "per_page": per_page, "cursor": body["next_cursor"]}).json()
+        items += body["items"]
+    return [(item["name"], item["posts"]) for item in items]
+
+
+def test_order_by_count(client, catalogue):
+    assert _walk(client, {"order_by": "count", "prefix": "tc-"}) == list(COUNTS.items())
+
+
+def test_order_by_name(client, catalogue):
+    assert _walk(client, {"order_by": "name", "prefix": "tc-"}, per_page=3) == sorted(
+        COUNTS.items(), key=lambda item: item[0].casefold())
+
+
+# El prefijo no distingue mayúsculas y se aplica a toda la paginación.
+def test_prefix(client, catalogue):
+    assert _walk(client, {"order_by": "name", "prefix": "TC-T"}) == [("tc-tres", 3)]
+    assert _walk(client, {"prefix": "tc-m"}) == [("TC-Mayus", 1)]
+    assert _walk(client, {"prefix": "tc-no-existe"}) == []
+
+
+def test_per_page_is_capped(client, catalogue, monkeypatch):
+    monkeypatch.setattr("app.api.v1.tag.router.TAGS_MAX_PER_PAGE", 2)
+    body = client.get("/tags", params={"prefix": "tc-", "per_page": 100}).json()
+    assert body["per_page"] == 2 and len(body["items"]) == 2 and body["has_next"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-un-cursor",
+    encode_cursor("name", "asc", ["tc-dos", 1]),        # de otro orden
+    encode_cursor("count", "desc", ["3", 1]),           # count que no es un entero
+    encode_cursor("count", "desc", [True, 1]),
+    encode_cursor("count", "desc", [10 ** 30, 1]),      # no cabe en 64 bits
+    encode_cursor("count", "desc", [3, 10 ** 30]),
+])
+def test_invalid_cursor_returns_400(client, cursor):
+    assert client.get("/tags", params={"order_by": "count", "cursor": cursor}).status_code == 400
+
+
+def test_invalid_name_cursor_returns_400(client):
+    cursor = encode_cursor("name", "asc", [3, 1])
+    assert client.get("/tags", params={"order_by": "name", "cursor": cursor}).status_code == 400